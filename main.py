@@ -1,22 +1,28 @@
+import multiprocessing
 import pygame
 import sys
 import os
 from pygame import mixer
-from src.utils.config import Config
-from src.utils.music_manager import music_manager
 
-# initialize pygame
-pygame.init()
-os.environ['SDL_VIDEO_CENTERED'] = '1'
 
-# Получаем размеры экрана для окна на весь экран
-screen_info = pygame.display.Info()
-screen = pygame.display.set_mode((screen_info.current_w, screen_info.current_h),
-                                pygame.DOUBLEBUF | pygame.HWSURFACE | pygame.RESIZABLE)
-pygame.display.set_caption('Pacman Remastered')
+if __name__ == "__main__":
+    # Процессы пула генерации карт (pac-man-1/MapPool.py) запускаются методом spawn
+    # и заново импортируют этот модуль - окно и звук создаются только здесь.
+    # freeze_support нужен для собранного exe
+    multiprocessing.freeze_support()
 
+    from src.utils.music_manager import music_manager
+
+    # initialize pygame
+    pygame.init()
+    os.environ['SDL_VIDEO_CENTERED'] = '1'
+
+    # Получаем размеры экрана для окна на весь экран
+    screen_info = pygame.display.Info()
+    screen = pygame.display.set_mode((screen_info.current_w, screen_info.current_h),
+                                    pygame.DOUBLEBUF | pygame.HWSURFACE | pygame.RESIZABLE)
+    pygame.display.set_caption('Pacman Remastered')
 
-if __name__ == "__main__":
     from src.utils.config import Config
     
     # Загружаем настройки ПЕРЕД созданием страниц, чтобы тема применилась
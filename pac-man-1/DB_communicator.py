@@ -1,28 +1,97 @@
+import os
+import atexit
+from RecordsStore import RecordsStore
+
+# Сколько записей копить в открытой транзакции перед фиксацией
+FLUSH_EVERY = 16
+
+
+class ScoreStore:
+    """
+    Локальное хранилище рекордов поверх RecordsStore (SQLite).
+    Лучшие счета игроков читаются из базы один раз и дальше берутся
+    из словаря в памяти, новые записи фиксируются в базе пачками.
+    При первом запуске в базу переносится старый DataBase.txt.
+    """
+
+    def __init__(self, path="records.db", legacy_path="DataBase.txt"):
+        # Пути фиксируются при создании: текущая папка может меняться между вызовами
+        self.records = RecordsStore(path)
+        self.legacy_path = os.path.abspath(legacy_path)
+        self.high_scores = {}
+        self.pending = 0
+        # Увеличивается при каждой новой записи (по нему сцены понимают, что пора перерисоваться)
+        self.version = 0
+        self.loaded = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.records.migrate_legacy(self.legacy_path)
+        self.high_scores = self.records.best_scores()
+        self.loaded = True
+
+    def get_high(self, name):
+        if not self.loaded:
+            self.load()
+        return self.high_scores.get(name, 0)
+
+    def add(self, name, score):
+        if not self.loaded:
+            self.load()
+        score = int(score)
+        if score > self.high_scores.get(name, 0):
+            self.high_scores[name] = score
+        self.records.add(name, score)
+        self.version += 1
+        self.pending += 1
+        if self.pending >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.records.commit()
+        self.pending = 0
+
+    def latest(self, n):
+        if not self.loaded:
+            self.load()
+        return self.records.latest(n)
+
+    def get_all(self):
+        if not self.loaded:
+            self.load()
+        self.flush()
+        return [f"{name} {score}\n" for name, score in self.records.all_records()]
+
+
+score_store = ScoreStore()
+atexit.register(score_store.flush)
+
+
 def get_high(name):
-    result = 0
-    DataBase = open("DataBase.txt", "r")
-    lines = DataBase.readlines()
-    for line in lines:
-        line = line.split()
-        if line[0] == name and int(line[1]) > result:
-            result = int(line[1])
-    return result
+    return score_store.get_high(name)
 
 
 def make_a_record(name, score):
-    line = f"{name} {str(score)}" + '\n'
-    DataBase = open("DataBase.txt", "a+")
-    DataBase.write(line)
+    score_store.add(name, score)
+
+
+def flush_records():
+    score_store.flush()
+
+
+def get_latest(n):
+    return score_store.latest(n)
 
 
 def get_all():
-    DataBase = open("DataBase.txt", "r")
-    return DataBase.readlines()
+    return score_store.get_all()
 
 
 if __name__ == '__main__':
-    DataBase = open("DataBase.txt", "r")
-    lines = DataBase.readlines()
+    lines = get_all()
     make_a_record("Roba", 3770)
     print(get_high("Greg"))
     for line in lines:
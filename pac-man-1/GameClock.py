@@ -0,0 +1,71 @@
+"""
+Игровые часы с фиксированным шагом симуляции.
+Логика игры (движение пакмана и призраков, таймеры) всегда идет тиками
+одинаковой длины 1 / TICK_RATE секунды, независимо от частоты кадров:
+прошедшее реальное время копится в accumulator и расходуется целыми тиками.
+Остаток (alpha от 0 до 1) используется для интерполяции позиций при отрисовке.
+
+    steps = clock.advance(dt_ms)   # сколько тиков выполнить за этот кадр
+    for _ in range(steps):
+        scene.tick(user_input)
+    scene.render(clock.alpha)
+
+Объекты, которые двигаются по тикам (PacMan, Ghost), наследуют InterpolatedPosition:
+remember_position() перед тиком, render_position(alpha) при отрисовке.
+"""
+
+TICK_RATE = 60  # тиков симуляции в секунду
+# Если кадр длился дольше (окно перетаскивали, загрузка карты, отладчик),
+# лишнее время отбрасывается, а не догоняется сотнями тиков подряд
+MAX_FRAME_MS = 250
+
+
+class GameClock:
+    def __init__(self, tick_rate=TICK_RATE, max_frame_ms=MAX_FRAME_MS):
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000.0 / tick_rate
+        self.max_frame_ms = max_frame_ms
+        self.accumulator = 0.0
+        self.ticks = 0  # всего выполнено тиков
+
+    def advance(self, dt_ms):
+        """Добавляет прошедшее время кадра и возвращает, сколько тиков нужно выполнить"""
+        dt_ms = min(max(dt_ms, 0), self.max_frame_ms)
+        self.accumulator += dt_ms
+        steps = int(self.accumulator // self.tick_ms)
+        self.accumulator -= steps * self.tick_ms
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """Доля следующего тика, которая уже прошла (0..1) - для интерполяции"""
+        return self.accumulator / self.tick_ms
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    @staticmethod
+    def ticks_for(ms, tick_rate=TICK_RATE):
+        """Перевод длительности из миллисекунд в тики"""
+        return int(round(ms * tick_rate / 1000))
+
+
+class InterpolatedPosition:
+    """
+    Примесь для объектов с screen_pos_x/screen_pos_y и cell_width:
+    хранит позицию прошлого тика и дает промежуточную позицию для отрисовки
+    """
+
+    def remember_position(self):
+        self.prev_screen_pos_x = self.screen_pos_x
+        self.prev_screen_pos_y = self.screen_pos_y
+
+    def render_position(self, alpha):
+        """Позиция для отрисовки между прошлым и текущим тиком; прыжки через порталы не сглаживаются"""
+        dx = self.screen_pos_x - self.prev_screen_pos_x
+        dy = self.screen_pos_y - self.prev_screen_pos_y
+        # За тик объект сдвигается меньше клетки - больший сдвиг означает телепорт через портал
+        if abs(dx) + abs(dy) > self.cell_width:
+            return self.screen_pos_x, self.screen_pos_y
+        return self.prev_screen_pos_x + dx * alpha, self.prev_screen_pos_y + dy * alpha
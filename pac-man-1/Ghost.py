@@ -1,14 +1,19 @@
-import pygame
 import random
 from Variables import *
+from GameClock import InterpolatedPosition
+from Maze import MapMetadata, UNREACHABLE
 
 
-class Ghost:
-    def __init__(self, name, screen_width, map, position, cell_width, difficulty=1):
-        self.screen = pygame.Surface((screen_width, screen_width), pygame.SRCALPHA)
+class Ghost(InterpolatedPosition):
+    def __init__(self, name, screen_width, map, position, cell_width, difficulty=1, metadata=None, rng=None):
+        # Размер спрайта в пикселях; сам спрайт рисует GameScene, призрак хранит только состояние
+        self.size = screen_width
         self.map = map
+        self.metadata = metadata if metadata is not None else MapMetadata(map)
         self.direction_movement = 'U'
         self.difficulty = difficulty
+        # Случайные цели в режиме Scared; со своим random.Random поведение воспроизводимо по seed
+        self.rng = rng if rng is not None else random
         
         if difficulty <= 3:
             self.base_speed = 1.5
@@ -23,6 +28,8 @@ class Ghost:
         self.cell_width = cell_width
         self.screen_pos_x = cell_width * self.pos_x - cell_width // 4
         self.screen_pos_y = cell_width * self.pos_y - cell_width // 4
+        # Позиция на прошлом тике - для интерполяции при отрисовке
+        self.remember_position()
         self.name = name
         self.mode = "Normal"
         self.target = None
@@ -42,7 +49,7 @@ class Ghost:
     def update(self, pacman, blinky=None):
         self.timer += 1
 
-        # Усилитель длится 5 секунд (при 60 FPS это 300 кадров)
+        # Усилитель длится 5 секунд (300 тиков при GameClock.TICK_RATE = 60)
         if self.mode == "Scared" and self.timer > 300:
             self.mode = "Normal"
 
@@ -52,25 +59,18 @@ class Ghost:
         self.manage_speed([pacman.pos_x, pacman.pos_y])
         self.manage_position()
 
-        self.screen.fill(color_transparent)
-        sprite_path = None
-        if self.mode == "Normal":
-            sprite_path = f"Static/Sprites/{str(self.name)}/{str(self.name)}-{self.direction_movement}.png"
-
-        else:
-            sprite_faze = str((self.timer % 30 > 15) + 1)
-            sprite_path = f"Static/Sprites/Scared/Fear-{sprite_faze}.png"
-        sprite = pygame.image.load(sprite_path)
-        self.screen.blit(sprite, (0, 0))
+    def sprite_phase(self):
+        """Кадр мигания испуганного призрака (1 или 2)"""
+        return (self.timer % 30 > 15) + 1
 
     def get_target(self, pacman, blinky=None):
         if self.mode == "Scared":
             if self.timer % 20 == 1:
-                return [random.randint(0, 30), random.randint(0, 27)]
+                return [self.rng.randint(0, 30), self.rng.randint(0, 27)]
             else:
                 return self.target
 
-        if self.map[self.pos_y][self.pos_x] == 'U':
+        if self.map.code(self.pos_y, self.pos_x) == UNREACHABLE:
             return [13, 0]
 
         if self.name == "Blinky":
@@ -126,25 +126,25 @@ class Ghost:
         for direction in potential_directions:
             if (
                 direction == 'U'
-                and self.map[i - 1][j] == 'O'
+                and self.map.is_free(i - 1, j)
                 and (last_i != i - 1 or last_j != j)
             ):
                 final_directions.append('U')
             if (
                 direction == 'R'
-                and self.map[i][j + 1] == 'O'
+                and self.map.is_free(i, j + 1)
                 and (last_i != i or last_j != j + 1)
             ):
                 final_directions.append('R')
             if (
                 direction == 'D'
-                and self.map[i + 1][j] == 'O'
+                and self.map.is_free(i + 1, j)
                 and (last_i != i + 1 or last_j != j)
             ):
                 final_directions.append('D')
             if (
                 direction == 'L'
-                and self.map[i][j - 1] == 'O'
+                and self.map.is_free(i, j - 1)
                 and (last_i != i or last_j != j - 1)
             ):
                 final_directions.append('L')
@@ -153,25 +153,25 @@ class Ghost:
             for direction in potential_directions:
                 if (
                     direction == 'U'
-                    and self.map[i - 1][j] != '#'
+                    and self.map.passable(i - 1, j)
                     and (last_i != i - 1 or last_j != j)
                 ):
                     final_directions.append('U')
                 if (
                     direction == 'R'
-                    and self.map[i][j + 1] != '#'
+                    and self.map.passable(i, j + 1)
                     and (last_i != i or last_j != j + 1)
                 ):
                     final_directions.append('R')
                 if (
                     direction == 'D'
-                    and self.map[i + 1][j] != '#'
+                    and self.map.passable(i + 1, j)
                     and (last_i != i + 1 or last_j != j)
                 ):
                     final_directions.append('D')
                 if (
                     direction == 'L'
-                    and self.map[i][j - 1] != '#'
+                    and self.map.passable(i, j - 1)
                     and (last_i != i or last_j != j - 1)
                 ):
                     final_directions.append('L')
@@ -235,13 +235,21 @@ class Ghost:
         self.screen_pos_x = self.cell_width * self.pos_x - self.cell_width // 4
 
     def update_pos(self):
-        new_pos_x = int((self.screen_pos_x + (self.screen.get_width() - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
-        new_pos_y = int((self.screen_pos_y + (self.screen.get_height() - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
+        new_pos_x = int((self.screen_pos_x + (self.size - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
+        new_pos_y = int((self.screen_pos_y + (self.size - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
         if new_pos_x != self.pos_x or new_pos_y != self.pos_y:
             self.last_cell = [self.pos_y, self.pos_x]
         self.pos_x = new_pos_x
         self.pos_y = new_pos_y
 
+    def send_to_prison(self):
+        """Возвращает призрака в комнату призраков рядом с точкой spawn"""
+        sp_i, sp_j = self.metadata.ghost_spawn
+        self.pos_x = sp_j + 2
+        self.pos_y = sp_i
+        self.screen_pos_x = self.cell_width * self.pos_x - self.cell_width // 4
+        self.screen_pos_y = self.cell_width * self.pos_y - self.cell_width // 4
+
     def go_to_scare_mode(self):
         self.mode = "Scared"
         self.timer = 0
@@ -0,0 +1,264 @@
+"""
+Кэш сгенерированных карт на диске.
+Карта полностью определяется версией генератора и seed (см. MapGenerator.generate_map),
+поэтому каждая проверенная карта хранится в своем файле с этим ключом в имени:
+    map_cache/0001-0000002a.pmm
+Файл: заголовок "<4sHII" (magic b"PMMC", версия генератора, seed, crc32 карты) + Maze.to_bytes().
+Битые файлы удаляются при чтении. Размер каталога ограничен max_bytes: при переполнении
+удаляются давно не использованные карты (время доступа - mtime, get() его обновляет).
+
+MapGenerator заполняет кэш сам, если ему назначен map_generator.cache. Это делается
+только в процессах MapPool и при наполнении из командной строки: процесс игры не
+читает и не пишет кэш внутри тика, он лишь берет первую карту партии до ее начала.
+Заранее наполнить кэш (seed подряд, начиная со start):
+
+    python MapCache.py --count 5000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from Maze import Maze
+
+DEFAULT_DIR = "map_cache"
+MAX_BYTES = 32 * 1024 * 1024  # ~35 тысяч карт
+MAGIC = b"PMMC"
+HEADER = struct.Struct("<4sHII")
+EXTENSION = ".pmm"
+# Карты из кэша берутся для новых партий без seed, только когда их достаточно много,
+# иначе игрок будет снова и снова получать одни и те же карты
+MIN_SEEDS_TO_PICK = 200
+
+
+class MapCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=MAX_BYTES, version=None):
+        if version is None:
+            from MapGenarator import GENERATOR_VERSION
+            version = GENERATOR_VERSION
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.size = None  # Сколько байт занимает каталог (считается при первой записи)
+        self.seeds = None  # seed карт текущей версии; каталог читается один раз, дальше список ведется в памяти
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0, "corrupt": 0}
+
+    def path_for(self, seed):
+        return os.path.join(self.directory, f"{self.version:04d}-{seed:08x}{EXTENSION}")
+
+    def get(self, seed):
+        """Карта (Maze) для seed или None"""
+        path = self.path_for(seed)
+        try:
+            with open(path, "rb") as map_file:
+                data = map_file.read()
+        except OSError:
+            self.stats["misses"] += 1
+            self._forget(seed)
+            return None
+        maze = self._decode(data, seed)
+        if maze is None:
+            self.stats["corrupt"] += 1
+            self.stats["misses"] += 1
+            self._remove(path)
+            self._forget(seed)
+            return None
+        try:
+            # Отмечаем использование для LRU
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return maze
+
+    def _decode(self, data, seed):
+        if len(data) < HEADER.size:
+            return None
+        magic, version, file_seed, checksum = HEADER.unpack_from(data, 0)
+        body = data[HEADER.size:]
+        if magic != MAGIC or version != self.version or file_seed != seed or zlib.crc32(body) != checksum:
+            return None
+        try:
+            return Maze.from_bytes(body)
+        except (struct.error, ValueError):
+            return None
+
+    def put(self, seed, maze):
+        body = maze.to_bytes()
+        data = HEADER.pack(MAGIC, self.version, seed, zlib.crc32(body)) + body
+        path = self.path_for(seed)
+        # В кэш одновременно могут писать процессы MapPool - пишем во временный файл и подменяем
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as map_file:
+                map_file.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[MapCache] Could not write {path}: {e}")
+            self._remove(tmp_path)
+            return False
+        self.stats["writes"] += 1
+        if self.seeds is not None and seed not in self.seeds:
+            self.seeds.append(seed)
+        if self.size is None:
+            self.size = self._scan_size()
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """[(mtime, size, path), ...] файлов кэша всех версий"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Удаляет самые давно использованные карты, пока каталог не станет меньше 90% лимита"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                self.stats["evicted"] += 1
+                self.seeds = None  # Перечитать при следующем обращении
+        self.size = total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _forget(self, seed):
+        if self.seeds is not None and seed in self.seeds:
+            self.seeds.remove(seed)
+
+    def cached_seeds(self):
+        """
+        seed всех карт текущей версии генератора. Каталог читается при первом вызове;
+        карты, которые потом записали другие процессы, появятся в списке при следующем запуске
+        """
+        if self.seeds is None:
+            self.seeds = self._scan_seeds()
+        return list(self.seeds)
+
+    def _scan_seeds(self):
+        prefix = f"{self.version:04d}-"
+        seeds = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return seeds
+        for name in names:
+            if name.startswith(prefix) and name.endswith(EXTENSION):
+                try:
+                    seeds.append(int(name[len(prefix):-len(EXTENSION)], 16))
+                except ValueError:
+                    continue
+        return seeds
+
+    def pick_seed(self, rng=None):
+        """
+        seed для новой партии, первая карта которой уже есть в кэше, или None,
+        если карт в кэше мало (тогда партии лучше взять случайный seed)
+        """
+        if self.seeds is None:
+            self.seeds = self._scan_seeds()
+        if len(self.seeds) < MIN_SEEDS_TO_PICK:
+            return None
+        return (rng or random).choice(self.seeds)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["bytes"] = self.size if self.size is not None else self._scan_size()
+        return stats
+
+
+# ---- Предварительное наполнение ----
+
+def _prewarm_seed(args):
+    """Выполняется в процессе пула: True если карту пришлось построить"""
+    seed, directory, max_bytes = args
+    from MapGenarator import map_generator
+    if map_generator.cache is None or map_generator.cache.directory != os.path.abspath(directory):
+        map_generator.cache = MapCache(directory, max_bytes)
+    if map_generator.cache.get(seed) is not None:
+        return False
+    map_generator.generate_map(seed)
+    return True
+
+
+def prewarm(count, start, directory=DEFAULT_DIR, max_bytes=MAX_BYTES, workers=1, progress=None):
+    """Строит карты для seed start..start+count-1; возвращает, сколько карт построено заново"""
+    jobs = [((start + i) & 0xFFFFFFFF, directory, max_bytes) for i in range(count)]
+    generated = 0
+    if workers <= 1:
+        results = map(_prewarm_seed, jobs)
+        for done, built in enumerate(results, 1):
+            generated += built
+            if progress:
+                progress(done)
+        return generated
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for done, built in enumerate(executor.map(_prewarm_seed, jobs, chunksize=16), 1):
+            generated += built
+            if progress:
+                progress(done)
+    return generated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate validated maps into the on-disk map cache")
+    parser.add_argument('--count', type=int, default=1000, help="how many consecutive seeds to build")
+    parser.add_argument('--start', type=int, help="first seed (random if not set)")
+    parser.add_argument('--dir', default=DEFAULT_DIR)
+    parser.add_argument('--max-mb', type=float, default=MAX_BYTES / 1024 / 1024)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    start = args.start if args.start is not None else random.getrandbits(32)
+    max_bytes = int(args.max_mb * 1024 * 1024)
+    step = max(1, args.count // 20)
+    began = time.perf_counter()
+
+    def progress(done):
+        if done % step == 0 or done == args.count:
+            print(f"{done}/{args.count} maps ({done / (time.perf_counter() - began):.1f}/s)", flush=True)
+
+    generated = prewarm(args.count, start, args.dir, max_bytes, args.workers, progress)
+    cache = MapCache(args.dir, max_bytes)
+    print(f"seeds {start}..{start + args.count - 1}: {generated} generated, {args.count - generated} already cached")
+    print(f"cache: {len(cache.cached_seeds())} maps, {cache.get_stats()['bytes'] / 1024:.0f} KB in {cache.directory}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,55 +8,185 @@ This function returns new map as 2d array.
 'p1' and 'p2' - mean two portal cells on the map
 'g' - means spawn point for ghosts. it has (0, 1) coords inside their 'house'
 'p' - means spawn point for Pac-Man
+
+All randomness goes through self.rng (random.Random), so the same seed
+always gives the same map: map_generator.generate_map(seed=42)
+With map_generator.cache set (MapCache.py) seeded maps are read from and
+written to the on-disk cache. The game only sets it in MapPool worker
+processes: generation inside a tick stays free of file I/O.
+
+Every generate_map() call is measured: map_generator.last_stats holds a
+GenerationStats for that call (wall time per stage, rejected skeletons and
+maps, quality_check reasons) and map_generator.stats sums all calls in this
+process. With map_generator.log_path set, each call is also appended to that
+file as one JSON line. To see where generation time goes:
+
+    python MapGenarator.py --count 50 --log generation.jsonl
 '''
 
 
+import argparse
+import json
 import random
+import sys
+import time
 import pygame
 from Variables import *
+from Maze import Maze
+
+# Bump whenever a change makes the same seed produce a different map:
+# cached maps of other versions are never used
+GENERATOR_VERSION = 1
+
+# Skeletons are kept only above this passages/walls ratio, full maps need at least MIN_RATIO
+SKELETON_MIN_RATIO = 0.8
+MIN_RATIO = 0.8
+
+
+class GenerationStats:
+    '''
+    What generate_map() spent its time on.
+    stage_time - seconds per stage; stages of make_skeleton() are prefixed with "skeleton.".
+    Stages called from inside other stages are not timed separately, so the
+    stage times add up to the generation time minus the loop overhead.
+    rejections - how many full maps quality_check rejected for each reason
+    (one map can fail for several reasons at once).
+    '''
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.maps = 0
+        self.cache_hits = 0
+        self.attempts = 0
+        self.rejected_skeletons = 0
+        self.rejected_maps = 0
+        self.rejections = {}
+        self.stage_time = {}
+        self.total_time = 0.0
+
+    def add_stage_time(self, name, seconds):
+        self.stage_time[name] = self.stage_time.get(name, 0.0) + seconds
+
+    def reject_map(self, reasons):
+        self.rejected_maps += 1
+        for reason in reasons:
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def merge(self, other):
+        self.maps += other.maps
+        self.cache_hits += other.cache_hits
+        self.attempts += other.attempts
+        self.rejected_skeletons += other.rejected_skeletons
+        self.rejected_maps += other.rejected_maps
+        for reason, count in other.rejections.items():
+            self.rejections[reason] = self.rejections.get(reason, 0) + count
+        for name, seconds in other.stage_time.items():
+            self.add_stage_time(name, seconds)
+        self.total_time += other.total_time
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "version": GENERATOR_VERSION,
+            "maps": self.maps,
+            "cache_hits": self.cache_hits,
+            "attempts": self.attempts,
+            "rejected_skeletons": self.rejected_skeletons,
+            "rejected_maps": self.rejected_maps,
+            "rejections": dict(self.rejections),
+            "stage_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stage_time.items()},
+            "total_ms": round(self.total_time * 1000, 3),
+        }
+
 
 class MapGenerator:
-    def __init__(self):
+    def __init__(self, rng=None):
         self.width = 8
         self.height = 9
-
-    def generate_map(self):
+        self.rng = rng if rng is not None else random.Random()
+        self.cache = None
+        self.stats = GenerationStats()  # all generate_map() calls of this generator
+        self.last_stats = None
+        self.log_path = None  # JSON lines log of generate_map() calls
+
+    def generate_map(self, seed=None):
+        stats = GenerationStats(seed)
+        start = time.perf_counter()
         map = None
-
-        while not quality_check(map):
-            map = self.make_skeleton()
-            map = self.add_ghots_house(map)
-            map = self.add_portals(map)
-            map = self.thin_passages(map)
-            map = self.fill_pockets(map)
-            map = self.add_ghots_house(map)
-            map = self.add_portals(map)
-            map = self.move_dead_ends_to_edges(map)
-            map = self.eleminate_dead_ends_on_edges(map)
-            map = self.eleminate_extra_passages(map)
-        map = self.convert_to_normal_type(map)
+        if seed is not None and self.cache is not None:
+            maze = self.cache.get(seed)
+            if maze is not None:
+                stats.cache_hits += 1
+                map = maze.to_rows()
+        if map is None:
+            if seed is not None:
+                self.rng.seed(seed)
+            map = self._generate(stats)
+            if seed is not None and self.cache is not None:
+                self._run_stage(stats, "cache_put", self.cache.put, seed, Maze.from_rows(map))
+        stats.maps += 1
+        stats.total_time = time.perf_counter() - start
+        self.last_stats = stats
+        self.stats.merge(stats)
+        if self.log_path is not None:
+            self._write_log(stats)
         return map
 
-    def make_skeleton(self, method="dfs"):
+    def _generate(self, stats):
+        while True:
+            stats.attempts += 1
+            map = self.make_skeleton(stats=stats)
+            map = self._run_stage(stats, "add_ghots_house", self.add_ghots_house, map)
+            map = self._run_stage(stats, "add_portals", self.add_portals, map)
+            map = self._run_stage(stats, "thin_passages", self.thin_passages, map)
+            map = self._run_stage(stats, "fill_pockets", self.fill_pockets, map)
+            map = self._run_stage(stats, "add_ghots_house", self.add_ghots_house, map)
+            map = self._run_stage(stats, "add_portals", self.add_portals, map)
+            map = self._run_stage(stats, "move_dead_ends_to_edges", self.move_dead_ends_to_edges, map)
+            map = self._run_stage(stats, "eleminate_dead_ends_on_edges", self.eleminate_dead_ends_on_edges, map)
+            map = self._run_stage(stats, "eleminate_extra_passages", self.eleminate_extra_passages, map)
+            reasons = self._run_stage(stats, "quality_check", quality_check_reasons, map)
+            if not reasons:
+                break
+            stats.reject_map(reasons)
+        return self._run_stage(stats, "convert_to_normal_type", self.convert_to_normal_type, map)
+
+    @staticmethod
+    def _run_stage(stats, name, stage, *args):
+        start = time.perf_counter()
+        result = stage(*args)
+        stats.add_stage_time(name, time.perf_counter() - start)
+        return result
+
+    def _write_log(self, stats):
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as log_file:
+                log_file.write(json.dumps(stats.to_dict()) + "\n")
+        except OSError as e:
+            print(f"[MapGenerator] Could not write {self.log_path}: {e}")
+            self.log_path = None
+
+    def make_skeleton(self, method="dfs", stats=None):
+        if stats is None:
+            stats = GenerationStats()
         map = None
-        while count_passages_to_walls_ratio(map) <= 0.8:
+        while count_passages_to_walls_ratio(map) <= SKELETON_MIN_RATIO:
+            if map is not None:
+                stats.rejected_skeletons += 1
             if method == 'prim':
-                print("Using Prim's algorithm")
-                maze = self.generate_thin_maze_prim()
+                maze = self._run_stage(stats, "skeleton.generate_thin_maze_prim", self.generate_thin_maze_prim)
             elif method == 'ellers':
-                print("Using Ellers's algorithm")
-                maze = self.generate_thin_maze_ellers()
+                maze = self._run_stage(stats, "skeleton.generate_thin_maze_ellers", self.generate_thin_maze_ellers)
             else:
-                print("Using DFS algorithm")
-                maze = self.generate_thin_maze()
-            maze = self.no_dead_ends(maze)
-            map = self.convert_to_thick_walls(maze)
-            map = self.clear_extra_walls(map)
-            map = self.cut_out_14X16_piece(map)
-            map = self.add_edges(map)
-            map = self.check_connection(map)
-            map = self.qudruple_map(map)
-            map = self.fill_pockets(map)
+                maze = self._run_stage(stats, "skeleton.generate_thin_maze", self.generate_thin_maze)
+            maze = self._run_stage(stats, "skeleton.no_dead_ends", self.no_dead_ends, maze)
+            map = self._run_stage(stats, "skeleton.convert_to_thick_walls", self.convert_to_thick_walls, maze)
+            map = self._run_stage(stats, "skeleton.clear_extra_walls", self.clear_extra_walls, map)
+            map = self._run_stage(stats, "skeleton.cut_out_14X16_piece", self.cut_out_14X16_piece, map)
+            map = self._run_stage(stats, "skeleton.add_edges", self.add_edges, map)
+            map = self._run_stage(stats, "skeleton.check_connection", self.check_connection, map)
+            map = self._run_stage(stats, "skeleton.qudruple_map", self.qudruple_map, map)
+            map = self._run_stage(stats, "skeleton.fill_pockets", self.fill_pockets, map)
         return map
 
     def convert_to_normal_type(self, map):
@@ -263,8 +393,8 @@ class MapGenerator:
         original_ratio = 1
         current_ratio = count_passages_to_walls_ratio(map)
         while current_ratio < original_ratio:
-            random_x = random.randint(1, len(map[0]) - 2)
-            random_y = random.randint(1, len(map) - 2)
+            random_x = self.rng.randint(1, len(map[0]) - 2)
+            random_y = self.rng.randint(1, len(map) - 2)
             if map[random_y][random_x] == 1:
                 map[random_y][random_x] = 0
 
@@ -313,7 +443,7 @@ class MapGenerator:
     def no_dead_ends(self, maze):
         for c in maze:
             if (c.wall_up + c.wall_right + c.wall_down + c.wall_left > 2):
-                remove_random_wall(c, maze, self.width, self.height)
+                remove_random_wall(c, maze, self.width, self.height, self.rng)
         return maze
 
     def generate_thin_maze(self):
@@ -331,14 +461,14 @@ class MapGenerator:
     def _generate_thin_maze_recursive(self, current_cell, grid, width, height):
         current_cell.visited = True
         
-        next_cell = current_cell.get_next(grid, width, height)
+        next_cell = current_cell.get_next(grid, width, height, self.rng)
         
         while next_cell is not None:
             remove_wall(current_cell, next_cell)
             
             self._generate_thin_maze_recursive(next_cell, grid, width, height)
             
-            next_cell = current_cell.get_next(grid, width, height)
+            next_cell = current_cell.get_next(grid, width, height, self.rng)
 
     def generate_thin_maze_ellers(self):
         return []
@@ -355,7 +485,7 @@ class MapGenerator:
                 grid.append(new_cell)
         
         # Начинаем со случайной клетки
-        start_index = random.randint(0, len(grid) - 1)
+        start_index = self.rng.randint(0, len(grid) - 1)
         start_cell = grid[start_index]
         start_cell.visited = True
         
@@ -384,7 +514,7 @@ class MapGenerator:
         # Пока есть клетки в frontier
         while frontier:
             # Выбираем случайную клетку из frontier
-            rand_index = random.randint(0, len(frontier) - 1)
+            rand_index = self.rng.randint(0, len(frontier) - 1)
             current_cell, from_cell = frontier.pop(rand_index)
             
             # Если клетка еще не посещена
@@ -413,7 +543,7 @@ class Cell:
         self.visited = False
         self.line_len = line_len
 
-    def get_next(self, grid, width, height):
+    def get_next(self, grid, width, height, rng=random):
         neighbors = []
 
         neighbor_up_index = get_index(self.i - 1, self.j, width, height)
@@ -431,7 +561,7 @@ class Cell:
             neighbors.append(grid[neighbor_left_index])
 
         if neighbors:
-            rand_index = random.randint(0, len(neighbors) - 1)
+            rand_index = rng.randint(0, len(neighbors) - 1)
             return neighbors[rand_index]
         else:
             return None
@@ -462,7 +592,7 @@ def remove_wall(cell_a, cell_b):
         cell_b.wall_down = False
 
 
-def remove_random_wall(current_cell, grid, width, height):
+def remove_random_wall(current_cell, grid, width, height, rng=random):
     walls = []
 
     neighbor_up_index = get_index(current_cell.i - 1, current_cell.j, width, height)
@@ -479,7 +609,7 @@ def remove_random_wall(current_cell, grid, width, height):
     if (current_cell.wall_left and neighbor_left_index >= 0):
         walls.append('L')
 
-    random_ind = random.randint(0, len(walls) - 1)
+    random_ind = rng.randint(0, len(walls) - 1)
     removeable_wall = walls[random_ind]
 
     if removeable_wall == 'D':
@@ -582,8 +712,57 @@ def quality_check(map):
         result = False
     if result and count_thick_passages(map) > 0:
         result = False
-    if result and count_passages_to_walls_ratio(map) < 0.8:
+    if result and count_passages_to_walls_ratio(map) < MIN_RATIO:
         result = False
     return result
 
+
+def quality_check_reasons(map):
+    '''
+    Why quality_check rejects the map: a list of "no_map", "dead_ends",
+    "thick_passages", "ratio" (empty list - the map is fine).
+    Unlike quality_check all conditions are checked, so it is a bit slower.
+    '''
+    if map is None:
+        return ["no_map"]
+    reasons = []
+    if count_dead_ends(map) > 0:
+        reasons.append("dead_ends")
+    if count_thick_passages(map) > 0:
+        reasons.append("thick_passages")
+    if count_passages_to_walls_ratio(map) < MIN_RATIO:
+        reasons.append("ratio")
+    return reasons
+
+
 map_generator = MapGenerator()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate maps and report where generation time goes")
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--seed', type=int, help="first seed, maps use seed..seed+count-1 (random if not set)")
+    parser.add_argument('--log', help="append per-map stats to this file as JSON lines")
+    args = parser.parse_args(argv)
+
+    generator = MapGenerator()
+    generator.log_path = args.log
+    first_seed = args.seed if args.seed is not None else random.getrandbits(32)
+    for i in range(args.count):
+        generator.generate_map((first_seed + i) & 0xFFFFFFFF)
+
+    stats = generator.stats
+    print(f"maps           {stats.maps} in {stats.total_time:.2f} s ({stats.total_time / stats.maps * 1000:.0f} ms/map)")
+    print(f"attempts       {stats.attempts} ({stats.attempts / stats.maps:.2f} per map)")
+    print(f"rejected       {stats.rejected_skeletons} skeletons, {stats.rejected_maps} maps")
+    for reason, count in sorted(stats.rejections.items(), key=lambda item: -item[1]):
+        print(f"  {reason:<13}{count}")
+    print("stages")
+    for name, seconds in sorted(stats.stage_time.items(), key=lambda item: -item[1]):
+        share = seconds / stats.total_time * 100 if stats.total_time else 0
+        print(f"  {name:<38}{seconds * 1000:9.1f} ms {share:5.1f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Фоновая генерация карт в пуле процессов.
+generate_map() крутит циклы "сгенерировать - проверить качество" и занимает
+от 100 до 250+ мс - в главном потоке это заметный рывок между уровнями.
+Карты детерминированы по seed (см. Simulation.next_map_seed), поэтому пул заранее
+строит карты для следующих seed партии, а setup("generated") забирает готовую.
+Если нужной карты нет или ее еще не начали строить - карта генерируется как раньше, синхронно;
+если процесс уже строит ее - ждем его, а не строим ту же карту второй раз.
+
+Процессы запускаются методом spawn (одинаково на Windows/Linux/macOS и без fork
+процесса с SDL); главный модуль должен запускать игру только под
+if __name__ == "__main__" и вызывать multiprocessing.freeze_support() для exe.
+"""
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+PREFETCH_DEPTH = 2  # сколько следующих карт держать готовыми
+WORKERS = 1
+# Карту, которую процесс уже строит, take() ждет до конца: это не дольше синхронной генерации.
+# Таймаут нужен только на случай зависшего процесса
+WORKER_HANG_TIMEOUT = 5.0
+
+
+def generate_rows(seed, cache_dir=None, cache_max_bytes=None):
+    """Выполняется в процессе пула; с cache_dir карта берется из кэша на диске и пишется в него"""
+    from MapGenarator import map_generator
+    if cache_dir is not None and (map_generator.cache is None or map_generator.cache.directory != cache_dir):
+        from MapCache import MapCache
+        map_generator.cache = MapCache(cache_dir, cache_max_bytes)
+    return map_generator.generate_map(seed)
+
+
+class MapPool:
+    def __init__(self, depth=PREFETCH_DEPTH, workers=WORKERS):
+        self.depth = depth
+        self.workers = workers
+        self.executor = None
+        self.cache = None  # MapCache: процессы пула читают и пополняют тот же кэш на диске
+        self.pending = {}  # seed -> Future
+        self.broken = False
+        self.stats = {"submitted": 0, "hits": 0, "waited": 0, "misses": 0, "hung": 0}
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def prefetch(self, seeds):
+        """Ставит в очередь карты для этих seed; карты для других seed больше не нужны и отменяются"""
+        if self.broken:
+            return
+        wanted = set(seeds)
+        for seed in list(self.pending):
+            if seed not in wanted:
+                self.pending.pop(seed).cancel()
+        cache_args = (self.cache.directory, self.cache.max_bytes) if self.cache is not None else ()
+        try:
+            for seed in seeds:
+                if seed not in self.pending:
+                    self.pending[seed] = self._get_executor().submit(generate_rows, seed, *cache_args)
+                    self.stats["submitted"] += 1
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            # Процессы не запускаются (нет прав, урезанное окружение) - дальше генерируем синхронно
+            print(f"[MapPool] Background generation disabled: {e}")
+            self.broken = True
+            self.pending.clear()
+
+    def add_ready(self, seed, rows):
+        """Карта, уже полученная другим путем (из MapCache до начала партии), - take(seed) вернет ее сразу"""
+        future = Future()
+        future.set_result(rows)
+        self.pending[seed] = future
+
+    def take(self, seed, timeout=WORKER_HANG_TIMEOUT):
+        """
+        Готовая карта (строки для Maze.from_rows) или None, если ее придется строить синхронно.
+        Карта, которая еще в очереди, отменяется (синхронно быстрее); карта, которую процесс
+        уже строит, дожидается. timeout - только защита от зависшего процесса
+        """
+        future = self.pending.pop(seed, None)
+        if future is None or future.cancel():
+            self.stats["misses"] += 1
+            return None
+        if not future.done():
+            self.stats["waited"] += 1
+        else:
+            self.stats["hits"] += 1
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Процесс завис: пул больше не используем, иначе каждая следующая карта ждала бы его
+            print(f"[MapPool] Map for seed {seed} is not ready after {timeout} s, background generation disabled")
+            self.stats["hung"] += 1
+            self.broken = True
+            self.shutdown()
+            return None
+        except Exception as e:
+            print(f"[MapPool] Background generation failed: {e}")
+            if isinstance(e, BrokenProcessPool):
+                self.broken = True
+            return None
+
+    def shutdown(self):
+        """Отменяет очередь и не ждет процессов; следующий prefetch() запустит пул заново"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["pending"] = len(self.pending)
+        stats["ready"] = sum(1 for future in self.pending.values() if future.done())
+        return stats
+
+
+map_pool = MapPool()
@@ -0,0 +1,185 @@
+"""
+Компактное представление карты.
+Клетки хранятся в плоском bytearray с числовыми кодами вместо строк,
+поэтому проверки в горячих местах (движение пакмана и призраков) - это
+одно обращение по индексу без сравнения строк.
+
+Старый код, который работает с картой как с map[i][j] и строками '#', 'O', ...,
+продолжает работать через адаптер строк MazeRow.
+"""
+import struct
+
+# Коды клеток
+FREE = 0            # 'O' - свободная клетка
+WALL = 1            # '#' - стена
+UNREACHABLE = 2     # 'U' - пустая клетка, куда никто не должен попадать
+PACMAN_SPAWN = 3    # 'p' - точка появления пакмана
+GHOST_SPAWN = 4     # 'g' - точка появления призраков
+PORTAL_1 = 5        # 'p1' - левый портал
+PORTAL_2 = 6        # 'p2' - правый портал
+
+SYMBOLS = ('O', '#', 'U', 'p', 'g', 'p1', 'p2')
+CODES = {symbol: code for code, symbol in enumerate(SYMBOLS)}
+
+
+class MazeRow:
+    """Адаптер строки карты: позволяет писать maze[i][j] и сравнивать со строками как раньше"""
+    __slots__ = ("maze", "i")
+
+    def __init__(self, maze, i):
+        self.maze = maze
+        self.i = i
+
+    def __getitem__(self, j):
+        return SYMBOLS[self.maze.code(self.i, j)]
+
+    def __setitem__(self, j, symbol):
+        self.maze.set_code(self.i, j, CODES[symbol])
+
+    def __len__(self):
+        return self.maze.width
+
+    def __iter__(self):
+        for j in range(self.maze.width):
+            yield self[j]
+
+
+class Maze:
+    def __init__(self, width, height, cells=None):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(cells) if cells is not None else bytearray(width * height)
+        if len(self.cells) != width * height:
+            raise ValueError(f"Maze expects {width * height} cells, got {len(self.cells)}")
+        # Увеличивается при каждом изменении клеток
+        self.version = 0
+        self.portal_1 = None
+        self.portal_2 = None
+        self.pacman_spawn = None
+        self.ghost_spawn = None
+        self._find_special_cells()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Создает карту из списка списков строк (формат MapGenerator и default_map)"""
+        height = len(rows)
+        width = len(rows[0])
+        cells = bytearray(CODES[symbol] for row in rows for symbol in row)
+        return cls(width, height, cells)
+
+    def to_rows(self):
+        """Обратное преобразование в список списков строк"""
+        return [[SYMBOLS[code] for code in self.cells[i * self.width:(i + 1) * self.width]]
+                for i in range(self.height)]
+
+    def to_bytes(self):
+        """Компактная сериализация: ширина и высота (uint16) и по байту кода на клетку"""
+        return struct.pack("<HH", self.width, self.height) + bytes(self.cells)
+
+    @classmethod
+    def from_bytes(cls, data):
+        width, height = struct.unpack_from("<HH", data, 0)
+        return cls(width, height, data[4:])
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.height
+        if not 0 <= i < self.height:
+            raise IndexError("maze row index out of range")
+        return MazeRow(self, i)
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield MazeRow(self, i)
+
+    def index(self, i, j):
+        # Отрицательный j работает как у списков: -1 - последний столбец
+        if j < 0:
+            j += self.width
+        if not 0 <= j < self.width:
+            raise IndexError("maze column index out of range")
+        return i * self.width + j
+
+    def code(self, i, j):
+        return self.cells[self.index(i, j)]
+
+    def set_code(self, i, j, code):
+        index = self.index(i, j)
+        if self.cells[index] == code:
+            return
+        old_code = self.cells[index]
+        self.cells[index] = code
+        self.version += 1
+        if old_code >= PACMAN_SPAWN or code >= PACMAN_SPAWN:
+            self._find_special_cells()
+
+    def is_wall(self, i, j):
+        return self.cells[self.index(i, j)] == WALL
+
+    def passable(self, i, j):
+        return self.cells[self.index(i, j)] != WALL
+
+    def is_free(self, i, j):
+        return self.cells[self.index(i, j)] == FREE
+
+    def cells_with_code(self, code):
+        """Все координаты (i, j) клеток с данным кодом в порядке обхода строк"""
+        width = self.width
+        result = []
+        index = self.cells.find(code)
+        while index != -1:
+            result.append((index // width, index % width))
+            index = self.cells.find(code, index + 1)
+        return result
+
+    def _find_special_cells(self):
+        """Запоминает координаты порталов и точек появления, чтобы не искать их каждый кадр"""
+        self.portal_1 = self._first_cell(PORTAL_1)
+        self.portal_2 = self._first_cell(PORTAL_2)
+        self.pacman_spawn = self._first_cell(PACMAN_SPAWN)
+        self.ghost_spawn = self._first_cell(GHOST_SPAWN)
+
+    def _first_cell(self, code):
+        index = self.cells.find(code)
+        if index == -1:
+            return None
+        return (index // self.width, index % self.width)
+
+
+# Клетки энерджайзеров (углы лабиринта), если они свободны
+ENERGIZER_SLOTS = ((1, 1), (29, 1), (1, 26), (29, 26))
+
+
+class MapMetadata:
+    """
+    Все координаты, которые раньше искались полным сканированием карты
+    (порталы, точки появления, ворота, комната призраков, энерджайзеры).
+    Считается один раз при создании карты и передается в GameScene, PacMan и Ghost
+    """
+
+    def __init__(self, maze):
+        self.portal_1 = maze.portal_1
+        self.portal_2 = maze.portal_2
+        self.pacman_spawn = maze.pacman_spawn
+        self.ghost_spawn = maze.ghost_spawn
+
+        sp_i, sp_j = self.ghost_spawn
+        # Ворота - две клетки над комнатой призраков
+        self.gates = ((sp_i - 2, sp_j + 2), (sp_i - 2, sp_j + 3))
+
+        # Клетки комнаты призраков вокруг точки spawn (без ворот)
+        self.ghost_house = []
+        for i in range(sp_i - 2, sp_i + 3):
+            # Сканируем комнату шире вправо (еще +3 клетки)
+            for j in range(sp_j - 3, sp_j + 8):
+                if 0 <= i < maze.height and 0 <= j < maze.width and (i, j) not in self.gates:
+                    if maze.code(i, j) in (UNREACHABLE, GHOST_SPAWN):
+                        self.ghost_house.append((i, j))
+
+        self.energizer_slots = frozenset(
+            (i, j) for i, j in ENERGIZER_SLOTS
+            if i < maze.height and j < maze.width and maze.code(i, j) == FREE
+        )
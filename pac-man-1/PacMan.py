@@ -1,11 +1,14 @@
-import pygame
-from Variables import *
+import pygame  # только коды клавиш pygame.K_*
+from GameClock import InterpolatedPosition
+from Maze import Maze, MapMetadata, PORTAL_1, PORTAL_2
 
 
-class PacMan:
-    def __init__(self, screen_width, map, position, cell_width):
-        self.screen = pygame.Surface((screen_width, screen_width), pygame.SRCALPHA)
+class PacMan(InterpolatedPosition):
+    def __init__(self, screen_width, map, position, cell_width, metadata=None):
+        # Размер спрайта в пикселях; сам спрайт рисует GameScene, пакман хранит только состояние
+        self.size = screen_width
         self.map = map
+        self.metadata = metadata if metadata is not None else MapMetadata(map)
         self.direction_movement = 'R'
         self.direction_desired = 'R'
         self.speed = 2
@@ -14,6 +17,8 @@ class PacMan:
         self.cell_width = cell_width
         self.screen_pos_x = cell_width * self.pos_x - cell_width // 4
         self.screen_pos_y = cell_width * self.pos_y - cell_width // 4
+        # Позиция на прошлом тике - для интерполяции при отрисовке
+        self.remember_position()
         self.sprite_faze = 0
 
     def update(self, user_input):
@@ -21,34 +26,29 @@ class PacMan:
         self.manage_user_input(user_input)
         self.manage_speed()
         self.manage_position()
-        self.screen.fill(color_transparent)
-        sprite_path = f"Static/Sprites/Pacman/Pacman-{self.get_sprite()}"
-        sprite = pygame.image.load(sprite_path)
-        self.screen.blit(sprite, (0, 0))
-        # pygame.draw.circle(self.screen, color_yellow, (self.screen.get_width() // 2, self.screen.get_height() // 2), self.screen.get_width() // 2)
+        self.animate()
 
-    def get_sprite(self):
+    def animate(self):
         self.sprite_faze += 0.35
         if self.sprite_faze > 3:
             self.sprite_faze = 0
-        fazes = ["Closed", "Ajar", "Open", "Ajar"]
 
-        if fazes[int(self.sprite_faze)] != "Closed":
-            return f"{fazes[int(self.sprite_faze)]}-{self.direction_movement}.png"
-        else:
-            return f"{fazes[int(self.sprite_faze)]}.png"
+    def sprite_phase(self):
+        """Фаза рта для текущего кадра анимации: Closed, Ajar или Open"""
+        fazes = ["Closed", "Ajar", "Open", "Ajar"]
+        return fazes[int(self.sprite_faze)]
 
     def manage_portals(self):
         self.update_pos()
-        portal_pos = find_portals(self.map)
-        p1_pos = [portal_pos[0], portal_pos[1]]
-        p2_pos = [portal_pos[2], portal_pos[3]]
-        if self.map[self.pos_y][self.pos_x] == 'p1':
+        p1_pos = self.metadata.portal_1
+        p2_pos = self.metadata.portal_2
+        current_cell = self.map.code(self.pos_y, self.pos_x)
+        if current_cell == PORTAL_1:
             self.pos_x = p2_pos[1] - 1
             self.pos_y = p2_pos[0]
             self.screen_pos_x = self.cell_width * self.pos_x - self.cell_width // 4
             self.screen_pos_y = self.cell_width * self.pos_y - self.cell_width // 4
-        if self.map[self.pos_y][self.pos_x] == 'p2':
+        if current_cell == PORTAL_2:
             self.pos_x = p1_pos[1] + 1
             self.pos_y = p1_pos[0]
             self.screen_pos_x = self.cell_width * self.pos_x - self.cell_width // 4
@@ -69,26 +69,26 @@ class PacMan:
         i = self.pos_y
         j = self.pos_x
         if self.direction_movement == 'D':
-            if self.map[i + 1][j] != '#':
+            if self.map.passable(i + 1, j):
                 self.speed = 2
             elif self.screen_pos_y > self.pos_y * self.cell_width - self.cell_width // 4:
                 self.screen_pos_y = self.pos_y * self.cell_width - self.cell_width // 4
                 self.speed = 0
         elif self.direction_movement == 'L':
-            if self.map[i][j - 1] != '#':
+            if self.map.passable(i, j - 1):
                 self.speed = 2
             elif self.screen_pos_x < self.pos_x * self.cell_width - self.cell_width // 4:
                 self.screen_pos_x = self.pos_x * self.cell_width - self.cell_width // 4
                 self.speed = 0
 
         elif self.direction_movement == 'R':
-            if self.map[i][j + 1] != '#':
+            if self.map.passable(i, j + 1):
                 self.speed = 2
             elif self.screen_pos_x > self.pos_x * self.cell_width - self.cell_width // 4:
                 self.screen_pos_x = self.pos_x * self.cell_width - self.cell_width // 4
                 self.speed = 0
         elif self.direction_movement == 'U':
-            if self.map[i - 1][j] != '#':
+            if self.map.passable(i - 1, j):
                 self.speed = 2
             elif self.screen_pos_y < self.pos_y * self.cell_width - self.cell_width // 4:
                 self.screen_pos_y = self.pos_y * self.cell_width - self.cell_width // 4
@@ -108,13 +108,13 @@ class PacMan:
         if user_input[pygame.K_a]:
             self.direction_desired = 'L'
 
-        if self.direction_desired == 'U' and self.map[i - 1][j] != '#':
+        if self.direction_desired == 'U' and self.map.passable(i - 1, j):
             self.direction_movement = self.direction_desired
-        if self.direction_desired == 'R' and self.map[i][j + 1] != '#':
+        if self.direction_desired == 'R' and self.map.passable(i, j + 1):
             self.direction_movement = self.direction_desired
-        if self.direction_desired == 'D' and self.map[i + 1][j] != '#':
+        if self.direction_desired == 'D' and self.map.passable(i + 1, j):
             self.direction_movement = self.direction_desired
-        if self.direction_desired == 'L' and self.map[i][j - 1] != '#':
+        if self.direction_desired == 'L' and self.map.passable(i, j - 1):
             self.direction_movement = self.direction_desired
 
     def align(self):
@@ -130,11 +130,14 @@ class PacMan:
         self.screen_pos_x = self.cell_width * self.pos_x - self.cell_width // 4
 
     def update_pos(self):
-        self.pos_x = int((self.screen_pos_x + (self.screen.get_width() - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
-        self.pos_y = int((self.screen_pos_y + (self.screen.get_height() - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
+        self.pos_x = int((self.screen_pos_x + (self.size - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
+        self.pos_y = int((self.screen_pos_y + (self.size - self.cell_width // 2) // 2 + self.cell_width // 4) // self.cell_width)
 
 
 def find_portals(map):
+    if isinstance(map, Maze):
+        # Координаты порталов уже посчитаны при создании карты
+        return [*map.portal_1, *map.portal_2]
     result = [None] * 4
     for i in range(len(map)):
         for j in range(len(map[0])):
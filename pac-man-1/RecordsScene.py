@@ -1,26 +1,60 @@
+import os
+import sys
 import pygame
 from Variables import *
 from DB_communicator import *
 
+# Виджет списка лежит в src/widgets - добавляем корень проекта в путь
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from src.widgets.virtual_list import VirtualList
+
+# Сколько записей помещается на экран
+RECORDS_ON_SCREEN = 14
+# Сколько последних записей можно пролистать
+RECORDS_LIMIT = 1000
+# Задержка между шагами прокрутки при зажатой стрелке (мс)
+SCROLL_REPEAT_MS = 80
+
 
 class RecordsScene:
     def __init__(self):
         self.screen = pygame.Surface((1280, 720))
         self.stay_here = True
+        # Версия хранилища и позиция прокрутки, для которых экран уже нарисован
+        self.rendered_state = None
+        self.records_version = None
+        self.last_scroll_time = 0
+        self.font_regular = None
+        self.records_list = VirtualList(self.render_record, lambda record, index: record, RECORDS_ON_SCREEN)
+
+    def render_record(self, record, index, width, height):
+        name, score = record
+        return self.font_regular.render(f"{name} {score}", True, color_white)
 
     def update(self, user_input):
         self.manage_user_input(user_input)
 
-        font_regular = pygame.font.Font('Static/Fonts/mini_pixel-7.ttf', 50)
+        if self.font_regular is None:
+            self.font_regular = pygame.font.Font('Static/Fonts/mini_pixel-7.ttf', 50)
+            self.records_list.set_row_size(self.screen.get_width() - 200, 40)
+
+        # Список перечитываем только если появились новые записи
+        if self.records_version != score_store.version:
+            self.records_version = score_store.version
+            self.records_list.set_items(get_latest(RECORDS_LIMIT))
+            # Новые записи сдвигают индексы - старые строки больше не подходят
+            self.records_list.invalidate()
+
+        # Перерисовываем экран только если что-то изменилось
+        state = (self.records_version, self.records_list.scroll_offset)
+        if self.rendered_state == state:
+            return
+        self.rendered_state = state
+
         font_large = pygame.font.Font('Static/Fonts/mini_pixel-7.ttf', 70)
         font_small = pygame.font.Font('Static/Fonts/mini_pixel-7.ttf', 30)
-        lines = get_all()
-        lines.reverse()
-
-        surfaces = []
-        for line in lines:
-            new_surface = font_regular.render(line, True, color_white)
-            surfaces.append(new_surface)
 
         header = font_large.render("RECORDS", True, color_white)
         go_back_text = font_small.render("Press 'B' to go back", True, color_white)
@@ -29,9 +63,18 @@ class RecordsScene:
         self.screen.blit(header, (middle - header.get_width() // 2, 20))
         self.screen.blit(go_back_text, (middle - header.get_width() // 2, self.screen.get_height() - 50))
 
-        for i in range(len(surfaces)):
-            self.screen.blit(surfaces[i], (100, 100 + 40 * i))
+        self.records_list.draw(self.screen, 100, 100)
 
     def manage_user_input(self, user_input):
         if user_input[pygame.K_b]:
             self.stay_here = False
+
+        now = pygame.time.get_ticks()
+        if now - self.last_scroll_time < SCROLL_REPEAT_MS:
+            return
+        if user_input[pygame.K_UP]:
+            self.records_list.scroll_by(-1)
+            self.last_scroll_time = now
+        elif user_input[pygame.K_DOWN]:
+            self.records_list.scroll_by(1)
+            self.last_scroll_time = now
@@ -0,0 +1,221 @@
+"""
+Локальное хранилище рекордов на SQLite (вместо плоского DataBase.txt).
+Запросы идут по индексам:
+  records(score DESC, id)      - top(n) и постраничный вывод page_after() (keyset, без OFFSET)
+  best(name) PRIMARY KEY       - best_for(user)
+Место игрока rank_of(user) SQLite за логарифм не посчитает (COUNT(*) перебирает весь
+диапазон индекса), поэтому лучшие счета один раз загружаются из best в LeaderboardIndex
+(src/utils/leaderboard_index.py), который add() дальше обновляет сам.
+При первом открытии один раз импортируются старые форматы:
+DataBase.txt ("имя счет") и res/hiscore.txt ("счет имя из нескольких слов").
+"""
+import os
+import sys
+import sqlite3
+import time
+
+# LeaderboardIndex лежит в src/utils - добавляем корень проекта в путь
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from src.utils.leaderboard_index import LeaderboardIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_by_score ON records (score DESC, id);
+CREATE TABLE IF NOT EXISTS best (
+    name TEXT PRIMARY KEY,
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS best_by_score ON best (score DESC);
+CREATE TABLE IF NOT EXISTS migrations (
+    source TEXT PRIMARY KEY,
+    imported INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+def get_res_dir():
+    """Get the res directory path, works in both dev and exe"""
+    if getattr(sys, 'frozen', False):
+        # Running in exe - use sys._MEIPASS
+        base_dir = sys._MEIPASS
+    else:
+        # Running in dev - go up from pac-man-1 to project root
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, "res")
+
+
+def parse_database_line(line):
+    """'Greg 69420' -> ("Greg", 69420) или None для битой строки"""
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+    try:
+        return parts[0], int(parts[1])
+    except ValueError:
+        return None
+
+
+def parse_hiscore_line(line):
+    """'90000 Agatha agnes' -> ("Agatha agnes", 90000) или None для битой строки"""
+    parts = line.split(None, 1)
+    if len(parts) < 2:
+        return None
+    try:
+        return parts[1].strip(), int(parts[0])
+    except ValueError:
+        return None
+
+
+class RecordsStore:
+    def __init__(self, path="records.db"):
+        self.path = os.path.abspath(path)
+        self.connection = None
+        self.index = None  # LeaderboardIndex по таблице best, строится при первом rank_of()
+
+    def open(self):
+        if self.connection is not None:
+            return self.connection
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    def commit(self):
+        if self.connection is not None:
+            self.connection.commit()
+
+    # ---- Запись ----
+
+    def add(self, name, score, created=None):
+        """Добавляет запись. Транзакция не фиксируется - для этого есть commit()"""
+        self._insert_many(((name, int(score)),), created)
+
+    def _insert_many(self, records, created=None):
+        connection = self.open()
+        created = time.time() if created is None else created
+        for name, score in records:
+            connection.execute(
+                "INSERT INTO records (name, score, created) VALUES (?, ?, ?)",
+                (name, score, created))
+            connection.execute(
+                "INSERT INTO best (name, score) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET score = excluded.score "
+                "WHERE excluded.score > best.score",
+                (name, score))
+            if self.index is not None:
+                best = self.index.score_of(name)
+                if best is None or score > best:
+                    self.index.update(name, score)
+
+    # ---- Запросы ----
+
+    def top(self, n):
+        """n лучших записей: [(name, score), ...]"""
+        return [(name, score) for _, name, score in self.page_after(None, n)]
+
+    def page_after(self, last=None, limit=20):
+        """
+        Следующая страница после записи last = (score, id) из предыдущей страницы.
+        Не пропускает offset строк, как LIMIT/OFFSET, а сразу встает на место по индексу.
+        Возвращает [(id, name, score), ...]
+        """
+        if last is None:
+            return self.open().execute(
+                "SELECT id, name, score FROM records ORDER BY score DESC, id LIMIT ?",
+                (limit,)).fetchall()
+        score, record_id = last
+        return self.open().execute(
+            "SELECT id, name, score FROM records "
+            "WHERE score < ? OR (score = ? AND id > ?) "
+            "ORDER BY score DESC, id LIMIT ?",
+            (score, score, record_id, limit)).fetchall()
+
+    def latest(self, n):
+        """n последних записей, новые первыми"""
+        return self.open().execute(
+            "SELECT name, score FROM records ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+
+    def all_records(self):
+        """Все записи в порядке добавления"""
+        return self.open().execute("SELECT name, score FROM records ORDER BY id").fetchall()
+
+    def best_for(self, name):
+        """Лучший счет игрока или None если игрок не найден"""
+        row = self.open().execute("SELECT score FROM best WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def best_scores(self):
+        """Словарь имя -> лучший счет"""
+        return dict(self.open().execute("SELECT name, score FROM best"))
+
+    def get_index(self):
+        """LeaderboardIndex лучших счетов всех игроков (загружается из best один раз)"""
+        if self.index is None:
+            self.index = LeaderboardIndex(self.open().execute("SELECT name, score FROM best"))
+        return self.index
+
+    def rank_of(self, name):
+        """Место игрока среди лучших результатов всех игроков (с 1) или None; равные счета - по имени"""
+        return self.get_index().rank_of(name)
+
+    def count(self):
+        return self.open().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    # ---- Миграция старых файлов ----
+
+    def migrate_file(self, path, parse_line, source=None):
+        """
+        Один раз импортирует записи из текстового файла.
+        Повторный вызов для того же источника ничего не делает.
+        Возвращает количество импортированных записей
+        """
+        connection = self.open()
+        source = source or os.path.basename(path)
+        if connection.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone():
+            return 0
+        if not os.path.exists(path):
+            return 0
+        records = []
+        with open(path, "r", encoding="utf-8", errors="replace") as old_file:
+            for line in old_file:
+                record = parse_line(line)
+                if record is not None:
+                    records.append(record)
+        self._insert_many(records, created=os.path.getmtime(path))
+        connection.execute("INSERT INTO migrations (source, imported, created) VALUES (?, ?, ?)",
+                           (source, len(records), time.time()))
+        connection.commit()
+        return len(records)
+
+    def migrate_legacy(self, database_path="DataBase.txt", hiscore_path=None):
+        """Импорт DataBase.txt и res/hiscore.txt"""
+        if hiscore_path is None:
+            hiscore_path = os.path.join(get_res_dir(), "hiscore.txt")
+        # hiscore.txt - таблица из старой версии игры, она старше DataBase.txt,
+        # поэтому импортируется первой и не попадает в начало latest()
+        imported = self.migrate_file(hiscore_path, parse_hiscore_line, "hiscore.txt")
+        imported += self.migrate_file(os.path.abspath(database_path), parse_database_line, "DataBase.txt")
+        return imported
+
+
+if __name__ == '__main__':
+    store = RecordsStore()
+    print("imported", store.migrate_legacy())
+    print("records", store.count())
+    for place, (name, score) in enumerate(store.top(10), 1):
+        print(place, name, score)
+    store.close()
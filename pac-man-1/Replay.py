@@ -0,0 +1,261 @@
+"""
+Запись ввода и покадровое воспроизведение партий.
+Симуляция детерминирована (seed + ввод по тикам, см. Simulation.py), поэтому
+для повтора партии достаточно записать клавиши на каждом тике.
+
+Формат файла (.pmr, little-endian):
+    заголовок  "<4sHIHHHBIII": magic b"PMRP", версия, seed, сложность, тиков в секунду,
+               высота поля в пикселях (от нее зависит размер клетки и движение),
+               тип карты (0 - default, 1 - generated), число тиков, итоговый счет, число серий
+               (в версии 1 высоты поля нет - такие записи сделаны на поле высотой 813)
+    серии      "<IH" на каждую: сколько тиков подряд держалась маска, маска клавиш
+Маска - по биту на клавишу из RECORDED_KEYS. Ввод почти всегда постоянен
+десятки тиков подряд, поэтому минута игры занимает несколько килобайт.
+
+    python Replay.py replays/game.pmr                  # без окна, с проверкой итогового счета
+    python Replay.py replays/game.pmr --visible --speed 10
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+
+import pygame
+from GameClock import GameClock, TICK_RATE
+from Simulation import Simulation, KeyState, FIELD_HEIGHT
+
+MAGIC = b"PMRP"
+VERSION = 2
+HEADER = struct.Struct("<4sHIHHHBIII")
+HEADER_V1 = struct.Struct("<4sHIHHBIII")
+V1_FIELD_HEIGHT = 813
+RUN = struct.Struct("<IH")
+MAX_RUN = 0xFFFFFFFF
+
+MAP_TYPES = ("default", "generated")
+MAX_SPEED = 100
+
+# Клавиши, которые читает игра (движение, пауза, перезапуски, рекорды, музыка, dev)
+RECORDED_KEYS = (
+    pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+    pygame.K_p, pygame.K_r, pygame.K_c, pygame.K_g,
+    pygame.K_v, pygame.K_m, pygame.K_h,
+)
+
+
+def encode_keys(user_input):
+    """Нажатые клавиши (как pygame.key.get_pressed()) -> битовая маска"""
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if user_input[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def decode_keys(mask):
+    return KeyState(key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit))
+
+
+class ReplayError(Exception):
+    pass
+
+
+class InputRecorder:
+    """
+    Пишет ввод симуляции по тикам. Создается сразу после первого setup(),
+    до первого тика: состояние на этот момент полностью задается seed, сложностью и типом карты
+    """
+
+    def __init__(self, simulation, map_type):
+        self.simulation = simulation
+        self.seed = simulation.seed
+        self.difficulty = simulation.difficulty
+        self.map_type = map_type
+        self.tick_rate = TICK_RATE
+        self.field_height = simulation.field_height
+        self.ticks = 0
+        self.runs = []  # [[count, mask], ...]
+
+    def record(self, user_input):
+        mask = encode_keys(user_input)
+        if self.runs and self.runs[-1][1] == mask and self.runs[-1][0] < MAX_RUN:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        self.ticks += 1
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.difficulty, self.tick_rate, self.field_height,
+                             MAP_TYPES.index(self.map_type), self.ticks, self.simulation.score, len(self.runs))
+        return header + b"".join(RUN.pack(count, mask) for count, mask in self.runs)
+
+    def save(self, path):
+        """Атомарно сохраняет запись (временный файл + replace)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+        os.replace(tmp_path, path)
+        return path
+
+
+class Replay:
+    def __init__(self, seed, difficulty, map_type, tick_rate, ticks, final_score, runs, field_height=FIELD_HEIGHT):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.map_type = map_type
+        self.tick_rate = tick_rate
+        self.field_height = field_height
+        self.ticks = ticks
+        self.final_score = final_score
+        self.runs = runs
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER_V1.size:
+            raise ReplayError("file is too short")
+        magic, version = struct.unpack_from("<4sH", data, 0)
+        if magic != MAGIC:
+            raise ReplayError("not a replay file")
+        if version == 1:
+            header = HEADER_V1
+            seed, difficulty, tick_rate, map_type, ticks, final_score, run_count = header.unpack_from(data, 0)[2:]
+            field_height = V1_FIELD_HEIGHT
+        elif version == VERSION:
+            header = HEADER
+            if len(data) < header.size:
+                raise ReplayError("file is too short")
+            seed, difficulty, tick_rate, field_height, map_type, ticks, final_score, run_count = \
+                header.unpack_from(data, 0)[2:]
+        else:
+            raise ReplayError(f"unsupported replay version {version}")
+        if map_type >= len(MAP_TYPES):
+            raise ReplayError(f"unknown map type {map_type}")
+        if len(data) != header.size + run_count * RUN.size:
+            raise ReplayError("replay is truncated")
+        runs = [RUN.unpack_from(data, header.size + i * RUN.size) for i in range(run_count)]
+        if sum(count for count, _ in runs) != ticks:
+            raise ReplayError("tick count does not match the input runs")
+        return cls(seed, difficulty, MAP_TYPES[map_type], tick_rate, ticks, final_score, runs, field_height)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as replay_file:
+            return cls.from_bytes(replay_file.read())
+
+    def inputs(self):
+        """Клавиши по тикам"""
+        for count, mask in self.runs:
+            keys = decode_keys(mask)
+            for _ in range(count):
+                yield keys
+
+    def make_simulation(self, simulation=None):
+        """Симуляция в том же состоянии, что и в начале записи"""
+        if self.tick_rate != TICK_RATE:
+            raise ReplayError(f"replay was recorded at {self.tick_rate} ticks/s, the game runs at {TICK_RATE}")
+        if simulation is None:
+            simulation = Simulation(self.field_height, seed=self.seed)
+        elif simulation.field_height != self.field_height:
+            # Размер клетки считается от высоты поля - на другом поле запись разойдется с игрой
+            raise ReplayError(f"replay was recorded on a {self.field_height} px field, "
+                              f"this one is {simulation.field_height} px")
+        simulation.difficulty = self.difficulty
+        simulation.setup(self.map_type)
+        return simulation
+
+
+def prune_replays(directory, keep):
+    """Удаляет самые старые записи, оставляя keep последних"""
+    try:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pmr")]
+    except OSError:
+        return
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def replay_headless(replay):
+    """Прогоняет запись без окна; возвращает (симуляция, секунды)"""
+    simulation = replay.make_simulation()
+    start = time.perf_counter()
+    for keys in replay.inputs():
+        simulation.tick(keys)
+    simulation.drain_events()
+    return simulation, time.perf_counter() - start
+
+
+def replay_visible(replay, speed=1):
+    """Показывает запись в окне со скоростью speed (1..MAX_SPEED); рекорды не пишутся, звуки - только на x1"""
+    from GameScene import GameScene
+
+    speed = max(1, min(MAX_SPEED, speed))
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    pygame.display.set_caption(f"Pac-Man replay x{speed}")
+    scene = GameScene(seed=replay.seed)
+    scene.save_records = False
+    scene.sounds_enabled = speed == 1
+    replay.make_simulation(scene.simulation)
+    scene.handle_events()
+
+    # На скорости x100 за кадр проходит больше тиков, чем обычный потолок GameClock
+    clock = GameClock(max_frame_ms=250 * speed)
+    frame_clock = pygame.time.Clock()
+    inputs = replay.inputs()
+    done = False
+    while not done:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return scene.simulation
+        for _ in range(clock.advance(frame_clock.tick(60) * speed)):
+            keys = next(inputs, None)
+            if keys is None:
+                done = True
+                break
+            scene.tick(keys)
+        scene.handle_events()
+        scene.render(clock.alpha if not done else 1.0)
+        screen.blit(scene.screen, (0, 0))
+        pygame.display.flip()
+    return scene.simulation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a recorded Pac-Man session")
+    parser.add_argument('path')
+    parser.add_argument('--visible', action='store_true', help="show the game in a window")
+    parser.add_argument('--speed', type=int, default=1, help=f"playback speed for --visible (1..{MAX_SPEED})")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = Replay.load(args.path)
+    except (OSError, ReplayError) as e:
+        print(f"Cannot load {args.path}: {e}", file=sys.stderr)
+        return 1
+    print(f"seed {replay.seed}, {replay.map_type} map, difficulty {replay.difficulty}, "
+          f"{replay.ticks} ticks ({replay.ticks / replay.tick_rate:.0f} s of play), {len(replay.runs)} input runs")
+
+    if args.visible:
+        simulation = replay_visible(replay, args.speed)
+    else:
+        simulation, elapsed = replay_headless(replay)
+        print(f"replayed in {elapsed:.2f} s ({replay.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if simulation.ticks < replay.ticks:
+        print("stopped early")
+        return 0
+    if simulation.score == replay.final_score:
+        print(f"score {simulation.score} matches the recording")
+        return 0
+    print(f"DESYNC: replay ended with score {simulation.score}, recording has {replay.final_score}")
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,593 @@
+"""
+Игровая логика без графики, звука и работы с файлами.
+Simulation хранит состояние партии (карта, пакман, призраки, еда, счет, жизни,
+сложность) и продвигает его тиками фиксированной длины (см. GameClock).
+Все, что в GameScene требовало окна, микшера или диска, симуляция не делает сама,
+а складывает в список событий:
+    ("sound", имя)         - проиграть звук из Static/Sounds
+    ("record", счет)       - записать рекорд (победа на уровне)
+    ("game_over", счет)    - записать рекорд и сбросить записи на диск
+    ("new_map", map_id)    - новая карта, слой лабиринта нужно построить заново
+    ("gates", клетки)      - ворота дома призраков открылись/закрылись
+    ("toggle_music", None) - клавиша M
+    ("show_records", None) - клавиша V
+GameScene забирает их через drain_events() после тиков кадра.
+
+Ввод - любой объект, который индексируется кодами клавиш pygame, как
+pygame.key.get_pressed(): KeyState, запись из ScriptedInput или ход GreedyPolicy.
+Без окна можно прогонять тысячи партий:
+
+    python Simulation.py --games 200 --policy greedy --workers 4
+"""
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame  # только коды клавиш pygame.K_*, окно и микшер не используются
+from Variables import default_map
+from MapGenarator import map_generator
+from PacMan import PacMan
+from Ghost import Ghost
+from FoodPiece import FoodPiece
+from GameClock import GameClock
+from Maze import Maze, MapMetadata, FREE, UNREACHABLE, GHOST_SPAWN
+
+# Игровое поле GameScene в пикселях; от высоты считается размер клетки, поэтому
+# она же пишется в заголовок записи партии (Replay.py)
+FIELD_WIDTH = 735
+FIELD_HEIGHT = 813
+SEED_MASK = 0xFFFFFFFF
+
+
+def new_seed():
+    """Случайный seed для партии, которой seed не задали"""
+    return random.SystemRandom().getrandbits(32)
+
+
+class KeyState:
+    """Набор нажатых клавиш с тем же интерфейсом, что у pygame.key.get_pressed(): keys[pygame.K_w] -> bool"""
+    __slots__ = ("pressed",)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+    def __eq__(self, other):
+        return isinstance(other, KeyState) and self.pressed == other.pressed
+
+    def __hash__(self):
+        return hash(self.pressed)
+
+
+NO_KEYS = KeyState()
+
+DIRECTION_KEYS = {
+    'U': pygame.K_w,
+    'R': pygame.K_d,
+    'D': pygame.K_s,
+    'L': pygame.K_a,
+}
+DIRECTION_STEPS = {
+    'U': (-1, 0),
+    'R': (0, 1),
+    'D': (1, 0),
+    'L': (0, -1),
+}
+
+
+class ScriptedInput:
+    """Заранее записанный ввод: по одному набору клавиш на тик, после конца - ничего не нажато"""
+
+    def __init__(self, steps):
+        self.steps = iter(steps)
+
+    def __call__(self, simulation):
+        for keys in self.steps:
+            return keys if isinstance(keys, KeyState) else KeyState(keys)
+        return NO_KEYS
+
+
+class GreedyPolicy:
+    """
+    Простой бот: идет по кратчайшему пути к ближайшей еде, обходя клетки
+    рядом с опасными призраками. Путь пересчитывается, только когда пакман
+    переходит в другую клетку
+    """
+
+    def __init__(self, danger_radius=2):
+        self.danger_radius = danger_radius
+        self._cell = None
+        self._keys = NO_KEYS
+
+    def __call__(self, simulation):
+        pacman = simulation.pacman
+        cell = (pacman.pos_y, pacman.pos_x)
+        if cell != self._cell:
+            self._cell = cell
+            direction = self.choose_direction(simulation, cell)
+            self._keys = KeyState((DIRECTION_KEYS[direction],)) if direction else NO_KEYS
+        return self._keys
+
+    def choose_direction(self, simulation, start):
+        maze = simulation.map
+        food = simulation.food_cells
+        danger = set()
+        for ghost in simulation.ghosts:
+            if ghost.mode != "Normal":
+                continue
+            for di in range(-self.danger_radius, self.danger_radius + 1):
+                for dj in range(-self.danger_radius, self.danger_radius + 1):
+                    if abs(di) + abs(dj) <= self.danger_radius:
+                        danger.add((ghost.pos_y + di, ghost.pos_x + dj))
+        # Сначала ищем безопасный путь, если его нет - любой
+        for blocked in (danger, ()):
+            direction = self._bfs(maze, start, food, blocked)
+            if direction:
+                return direction
+        return None
+
+    @staticmethod
+    def _bfs(maze, start, targets, blocked):
+        first_step = {start: None}
+        queue = deque((start,))
+        while queue:
+            i, j = queue.popleft()
+            if (i, j) in targets and (i, j) != start:
+                return first_step[(i, j)]
+            for direction, (di, dj) in DIRECTION_STEPS.items():
+                cell = (i + di, j + dj)
+                if not (0 <= cell[0] < maze.height and 0 <= cell[1] < maze.width):
+                    continue
+                if cell in first_step or cell in blocked or not maze.passable(*cell):
+                    continue
+                first_step[cell] = first_step[(i, j)] or direction
+                queue.append(cell)
+        return None
+
+
+class Simulation:
+    """
+    Вся случайность партии выводится из seed: n-я сгенерированная карта строится
+    с seed + n, а у призраков на каждой карте свой поток random.Random.
+    Одинаковый seed и одинаковый ввод дают одинаковую партию
+    """
+
+    def __init__(self, field_height=FIELD_HEIGHT, controller=None, seed=None, map_pool=None):
+        self.field_height = field_height
+        self.seed = (seed if seed is not None else new_seed()) & SEED_MASK
+        # MapPool из MapPool.py: заранее строит следующие карты в фоне (None - только синхронно)
+        self.map_pool = map_pool
+        self.maps_generated = 0  # Сколько карт уже сгенерировано в этой партии
+        self.map_seed = None  # seed текущей карты (None для стандартной)
+        self.ghost_rng = None  # Поток случайности призраков текущей карты
+        # Источник ввода для step(): controller(simulation) -> клавиши на этот тик
+        self.controller = controller
+        self.recorder = None  # InputRecorder из Replay.py, если партия записывается
+        self.events = []
+        self.ticks = 0
+        self.ivent_timer = 0
+        self.paused = False
+        self.pacman = None
+        self.ghosts = []
+        self.map = None
+        self.map_metadata = None  # Порталы, точки появления, ворота и т.д. текущей карты
+        self.map_id = 0  # Меняется при каждой новой карте
+        self.cell_width = 0
+        self.food = []
+        self.food_cells = {}  # (i, j) -> FoodPiece, чтобы не перебирать всю еду каждый тик
+        self.score = 0
+        self.lives = 3
+        self.difficulty = 1  # Уровень сложности (начинается с 1)
+        self.game_over = False
+        self.start_delay_ticks = GameClock.ticks_for(3000)  # Задержка перед стартом 3 секунды (в тиках)
+        self.start_delay_left = 0  # Сколько тиков задержки осталось
+
+    # ---- События ----
+
+    def emit(self, event, value=None):
+        self.events.append((event, value))
+
+    def drain_events(self):
+        """Забирает накопленные события (список очищается)"""
+        events = self.events
+        self.events = []
+        return events
+
+    # ---- Партия ----
+
+    def setup(self, map_type):
+        # При полном новом запуске (default map) сбрасываем счет, жизни, сложность
+        # (до создания призраков, чтобы их число считалось уже от сложности 1)
+        if map_type == "default":
+            self.score = 0
+            self.lives = 3
+            self.difficulty = 1
+            self.game_over = False
+
+        # Карта хранится в компактном виде; default_map копируется, поэтому ворота его не портят
+        if map_type == "default":
+            self.map = Maze.from_rows(default_map)
+            self.map_seed = None
+        elif map_type == "generated":
+            self.map_seed = self.next_map_seed()
+            rows = self.map_pool.take(self.map_seed) if self.map_pool is not None else None
+            if rows is None:
+                rows = map_generator.generate_map(self.map_seed)
+            self.map = Maze.from_rows(rows)
+            self.prefetch_maps()
+        self.map_id += 1
+        self.ghost_rng = random.Random(f"{self.seed}-{self.map_id}-ghosts")
+        # Координаты порталов, spawn, ворот и комнаты призраков считаются один раз на карту
+        self.map_metadata = MapMetadata(self.map)
+        self.cell_width = self.field_height // len(self.map)
+
+        self.pacman = self.spawn_pacman()
+        self.ghosts = self.init_ghosts()
+        self.reset_food()
+
+        # Запускаем задержку перед стартом
+        self.start_delay_left = self.start_delay_ticks
+
+        self.emit("new_map", self.map_id)
+        self.emit("sound", "game_start")
+
+    def next_map_seed(self):
+        map_seed = (self.seed + self.maps_generated) & SEED_MASK
+        self.maps_generated += 1
+        return map_seed
+
+    def upcoming_map_seeds(self, count):
+        return [(self.seed + self.maps_generated + k) & SEED_MASK for k in range(count)]
+
+    def prefetch_maps(self):
+        """Просит пул заранее построить карты следующих уровней"""
+        if self.map_pool is not None:
+            self.map_pool.prefetch(self.upcoming_map_seeds(self.map_pool.depth))
+
+    @property
+    def in_start_delay(self):
+        return self.start_delay_left > 0
+
+    def step(self, n=1, user_input=None):
+        """
+        Выполняет n тиков. Ввод на каждый тик берется из user_input (один и тот же
+        на все тики) или из controller. Возвращает game_over
+        """
+        for _ in range(n):
+            if user_input is not None:
+                keys = user_input
+            elif self.controller is not None:
+                keys = self.controller(self)
+            else:
+                keys = NO_KEYS
+            self.tick(keys)
+        return self.game_over
+
+    def tick(self, user_input):
+        """Один шаг симуляции (1 / TICK_RATE секунды)"""
+        self.ticks += 1
+        self.ivent_timer += 1
+        if self.recorder is not None:
+            self.recorder.record(user_input)
+        # Позиции до тика - от них интерполируется отрисовка
+        self.remember_positions()
+        self.manage_user_input(user_input)
+
+        # Если игра окончена - логику не обновляем
+        if self.game_over:
+            return
+
+        # Во время задержки перед стартом актеры стоят на месте
+        if self.start_delay_left > 0:
+            if not self.paused:
+                self.start_delay_left -= 1
+            return
+
+        # Обновляем логику игры только если не на паузе
+        if not self.paused:
+            self.pacman.update(user_input)
+            self.update_gosts()
+            self.game_logic()
+
+    def remember_positions(self):
+        if self.pacman:
+            self.pacman.remember_position()
+        for ghost in self.ghosts:
+            ghost.remember_position()
+
+    def game_logic(self):
+        if self.pacman_bumped_into_ghost():
+            if self.ghosts[0].mode == "Normal":
+                self.death()
+            else:
+                self.emit("sound", "eat_ghost")
+                self.send_ghost_to_prison()
+
+        if len(self.food) == 0:
+            self.emit("sound", "win")
+            self.emit("record", self.score)
+            self.next_level()
+
+        self.update_food()
+        self.check_gates()
+
+    def next_level(self):
+        """Новая сгенерированная карта со следующим уровнем сложности; счет и жизни сохраняются"""
+        saved_score = self.score
+        saved_lives = self.lives
+        saved_difficulty = self.difficulty
+        # Сложность увеличиваем до setup, чтобы призраки создавались уже для нового уровня
+        self.difficulty += 1
+        self.setup("generated")
+        self.score = saved_score
+        self.lives = saved_lives
+        self.difficulty = saved_difficulty + 1
+
+    def send_ghost_to_prison(self):
+        for ghost in self.ghosts:
+            if self.pacman.pos_x == ghost.pos_x and self.pacman.pos_y == ghost.pos_y:
+                ghost.send_to_prison()
+        num_of_ghost = self.how_many_prisoned_ghosts()
+        self.score += (200 * num_of_ghost)
+
+    def manage_user_input(self, user_input):
+        if self.ivent_timer < 10:
+            return
+        if user_input[pygame.K_p]:
+            self.paused = not self.paused
+            self.ivent_timer = 0
+        if user_input[pygame.K_r] and user_input[pygame.K_c]:
+            self.replay_on_current_map()
+            self.ivent_timer = 0
+        if user_input[pygame.K_r] and user_input[pygame.K_g]:
+            self.setup("generated")
+            self.ivent_timer = 0
+        if user_input[pygame.K_r] and user_input[pygame.K_d]:
+            self.setup("default")
+            self.ivent_timer = 0
+        if user_input[pygame.K_v]:
+            self.emit("show_records")
+        if user_input[pygame.K_m]:
+            self.emit("toggle_music")
+            self.ivent_timer = 0
+        if user_input[pygame.K_h]:
+            # Dev option: собрать все точки и перезапустить игру
+            self.collect_all_points()
+            self.ivent_timer = 0
+
+    def collect_all_points(self):
+        """Собирает все оставшиеся точки и перезапускает игру с сохранением счета"""
+        # Подсчитываем очки за все оставшиеся точки
+        self.score += len(self.food) * 10
+        # Очищаем все точки (симулируем их сбор)
+        self.food = []
+        self.food_cells = {}
+        # Симулируем процесс победы - генерируем новую карту
+        self.emit("sound", "win")
+        self.emit("record", self.score)
+        self.next_level()
+
+    def spawn_pacman(self):
+        width = self.cell_width
+        qw = width // 4 #quater width
+        return PacMan(width + 2 * qw, self.map, self.map_metadata.pacman_spawn, width, self.map_metadata)
+
+    def replay_on_current_map(self):
+        self.pacman = self.spawn_pacman()
+        self.ghosts = self.init_ghosts()
+        self.reset_food()
+        self.score = 0
+        self.lives = 3
+        # Устанавливаем задержку при перезапуске
+        self.start_delay_left = self.start_delay_ticks
+
+    def death(self):
+        self.emit("sound", "death")
+
+        if self.lives > 0:
+            self.lives -= 1
+            self.pacman = self.spawn_pacman()
+            self.ghosts = self.init_ghosts()
+            # Устанавливаем задержку при продолжении игры после смерти
+            self.start_delay_left = self.start_delay_ticks
+        else:
+            self.game_over = True
+            self.emit("game_over", self.score)
+
+    def check_gates(self):
+        i, j = self.map_metadata.gates[0]
+        gate_cell = 'U' if self.prisoned_ghosts() else '#'
+        if self.map[i][j] != gate_cell or self.map[i][j + 1] != gate_cell:
+            self.map[i][j] = gate_cell
+            self.map[i][j + 1] = gate_cell
+            self.emit("gates", ((i, j), (i, j + 1)))
+
+    def prisoned_ghosts(self):
+        for ghost in self.ghosts:
+            i = ghost.pos_y
+            j = ghost.pos_x
+            if self.map.code(i, j) == UNREACHABLE and ghost.mode == "Normal":
+                return True
+        return False
+
+    def how_many_prisoned_ghosts(self):
+        result = 0
+        for ghost in self.ghosts:
+            i = ghost.pos_y
+            j = ghost.pos_x
+            if self.map.code(i, j) in (UNREACHABLE, GHOST_SPAWN):
+                result += 1
+        return result
+
+    def scare_ghosts(self):
+        for ghost in self.ghosts:
+            ghost.go_to_scare_mode()
+
+    def update_food(self):
+        food_piece = self.food_cells.pop((self.pacman.pos_y, self.pacman.pos_x), None)
+        if food_piece is None:
+            return
+        if food_piece.type == "Energizer":
+            self.emit("sound", "energizer")
+            self.scare_ghosts()
+        if len(self.food) % 4 == 0:
+            self.emit("sound", "eating")
+        self.food.remove(food_piece)
+        self.score += 10
+
+    def reset_food(self):
+        self.food = self.init_food()
+        self.food_cells = {(piece.i, piece.j): piece for piece in self.food}
+
+    def init_food(self):
+        food_array = []
+        energizer_slots = self.map_metadata.energizer_slots
+        for i, j in self.map.cells_with_code(FREE):
+            new_food_piece = None
+            if (i, j) in energizer_slots:
+                new_food_piece = FoodPiece(i, j, "Energizer")
+            else:
+                new_food_piece = FoodPiece(i, j)
+            food_array.append(new_food_piece)
+        return food_array
+
+    def pacman_bumped_into_ghost(self):
+        return any(
+            self.pacman.pos_x == ghost.pos_x and self.pacman.pos_y == ghost.pos_y
+            for ghost in self.ghosts
+        )
+
+    def update_gosts(self):
+        blinky = self.ghosts[0]
+        for ghost in self.ghosts:
+            ghost.update(self.pacman, blinky)
+
+    def init_ghosts(self):
+        width = self.cell_width
+        qw = width // 4 #quater width
+        difficulty = self.difficulty
+
+        # Количество призраков:
+        # начинается с 2, каждые 3 уровня сложности добавляется еще один
+        # 1-3 -> 2 призрака, 4-6 -> 3, 7-9 -> 4, 10-12 -> 5, и т.д.
+        num_ghosts = 2 + max(0, (difficulty - 1) // 3)
+
+        # Порядок чередования типов призраков
+        ghost_types_cycle = ["Blinky", "Pinky", "Inky", "Clyde"]
+        # Клетки внутри комнаты призраков посчитаны заранее в map_metadata
+        house_cells = self.map_metadata.ghost_house
+
+        ghosts = []
+        for idx in range(num_ghosts):
+            ghost_name = ghost_types_cycle[idx % len(ghost_types_cycle)]
+            # Выбираем случайную свободную позицию внутри комнаты
+            pos_i, pos_j = self.ghost_rng.choice(house_cells)
+            ghost = Ghost(
+                ghost_name,
+                width + 2 * qw,
+                self.map,
+                [pos_i, pos_j],
+                width,
+                difficulty,
+                self.map_metadata,
+                random.Random(self.ghost_rng.getrandbits(64)),
+            )
+            ghosts.append(ghost)
+
+        return ghosts
+
+
+# ---- Пакетный прогон без окна ----
+
+POLICIES = {
+    'greedy': GreedyPolicy,
+    'idle': lambda: (lambda simulation: NO_KEYS),
+}
+
+
+def play_game(map_type="generated", policy="greedy", max_ticks=60 * 60 * 10, difficulty=1, seed=None):
+    """Одна партия до game over или max_ticks; возвращает итоги партии"""
+    simulation = Simulation(controller=POLICIES[policy](), seed=seed)
+    simulation.setup(map_type)
+    if difficulty != 1:
+        simulation.difficulty = difficulty
+        simulation.ghosts = simulation.init_ghosts()
+    start_difficulty = simulation.difficulty
+    deaths = 0
+    ghosts_eaten = 0
+    start = time.perf_counter()
+    while simulation.ticks < max_ticks and not simulation.game_over:
+        simulation.step(min(600, max_ticks - simulation.ticks))
+        for event, value in simulation.drain_events():
+            if event == "sound" and value == "death":
+                deaths += 1
+            elif event == "sound" and value == "eat_ghost":
+                ghosts_eaten += 1
+    return {
+        'seed': simulation.seed,
+        'score': simulation.score,
+        'ticks': simulation.ticks,
+        'levels_cleared': simulation.difficulty - start_difficulty,
+        'deaths': deaths,
+        'ghosts_eaten': ghosts_eaten,
+        'game_over': simulation.game_over,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def game_seed(seed, index):
+    """seed index-й партии серии; соседние партии не делят карты (у карт seed + n)"""
+    return random.Random(f"{seed}-{index}").getrandbits(32)
+
+
+def run_games(games, map_type="generated", policy="greedy", max_ticks=60 * 60 * 10, difficulty=1, workers=1,
+              seed=None):
+    """Серия партий; с заданным seed серия повторяется один в один"""
+    if seed is None:
+        seed = new_seed()
+    args = [(map_type, policy, max_ticks, difficulty, game_seed(seed, index)) for index in range(games)]
+    if workers <= 1:
+        return [play_game(*game_args) for game_args in args]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_play_game_args, args))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Pac-Man games for balancing and regression runs")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--map', choices=("generated", "default"), default="generated")
+    parser.add_argument('--policy', choices=tuple(POLICIES), default="greedy")
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 10,
+                        help="tick limit per game (60 ticks = 1 second of play)")
+    parser.add_argument('--difficulty', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, help="series seed (random if not set)")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else new_seed()
+    start = time.perf_counter()
+    results = run_games(args.games, args.map, args.policy, args.max_ticks, args.difficulty, args.workers, seed)
+    elapsed = time.perf_counter() - start
+
+    total_ticks = sum(result['ticks'] for result in results)
+    scores = sorted(result['score'] for result in results)
+    print(f"seed           {seed}")
+    print(f"games          {len(results)} in {elapsed:.1f} s ({len(results) / elapsed * 60:.0f} games/min)")
+    print(f"ticks          {total_ticks} ({total_ticks / elapsed:.0f} ticks/s)")
+    print(f"score          avg {sum(scores) / len(scores):.0f}  median {scores[len(scores) // 2]}  max {scores[-1]}")
+    print(f"levels cleared avg {sum(r['levels_cleared'] for r in results) / len(results):.2f}")
+    print(f"game over      {sum(r['game_over'] for r in results)} of {len(results)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
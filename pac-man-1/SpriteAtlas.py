@@ -0,0 +1,105 @@
+"""
+Атлас спрайтов пакмана и призраков.
+Все кадры из Static/Sprites загружаются один раз и дальше берутся из памяти,
+поэтому во время игры нет ни одного обращения к диску за спрайтами.
+"""
+import os
+import sys
+import time
+import pygame
+
+
+def get_sprites_dir():
+    """Get the sprites directory path, works in both dev and exe"""
+    if getattr(sys, 'frozen', False):
+        # Running in exe - use sys._MEIPASS
+        return os.path.join(sys._MEIPASS, "pac-man-1", "Static", "Sprites")
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "Static", "Sprites")
+
+
+class SpriteAtlas:
+    """
+    Кадры индексируются ключом (actor, phase, direction):
+    ("Pacman", "Closed", None), ("Pacman", "Open", "R"),
+    ("Blinky", "Normal", "U"), ("Scared", "1", None) и т.д.
+    """
+
+    def __init__(self, sprites_dir=None):
+        self.sprites_dir = sprites_dir
+        self.frames = {}
+        self.loaded = False
+        self.stats = {
+            "files_loaded": 0,
+            "load_time_ms": 0.0,
+            "lookups": 0,
+            "misses": 0,
+        }
+
+    def load(self):
+        """Загружает все кадры из папки спрайтов (повторные вызовы ничего не делают)"""
+        if self.loaded:
+            return
+        sprites_dir = self.sprites_dir or get_sprites_dir()
+        start = time.perf_counter()
+        for actor in sorted(os.listdir(sprites_dir)):
+            actor_dir = os.path.join(sprites_dir, actor)
+            if not os.path.isdir(actor_dir):
+                continue
+            for file_name in sorted(os.listdir(actor_dir)):
+                if not file_name.endswith(".png"):
+                    continue
+                key = parse_sprite_name(actor, file_name[:-4])
+                image = pygame.image.load(os.path.join(actor_dir, file_name))
+                try:
+                    image = image.convert_alpha()
+                except pygame.error:
+                    # Окно еще не создано - оставляем поверхность без конвертации
+                    pass
+                self.frames[key] = image
+                self.stats["files_loaded"] += 1
+        self.stats["load_time_ms"] = (time.perf_counter() - start) * 1000
+        self.loaded = True
+
+    def get(self, actor, phase=None, direction=None):
+        """Возвращает кадр по ключу или None если такого кадра нет"""
+        if not self.loaded:
+            self.load()
+        self.stats["lookups"] += 1
+        frame = self.frames.get((actor, phase, direction))
+        if frame is None:
+            self.stats["misses"] += 1
+        return frame
+
+    def pacman(self, phase, direction):
+        if phase == "Closed":
+            return self.get("Pacman", "Closed")
+        return self.get("Pacman", phase, direction)
+
+    def ghost(self, name, mode, direction, scared_phase=1):
+        if mode == "Scared":
+            return self.get("Scared", str(scared_phase))
+        return self.get(name, "Normal", direction)
+
+    def get_stats(self):
+        """Статистика загрузки: сколько файлов прочитано и сколько было обращений"""
+        stats = dict(self.stats)
+        stats["frames"] = len(self.frames)
+        return stats
+
+
+def parse_sprite_name(actor, name):
+    """
+    Pacman-Closed -> ("Pacman", "Closed", None)
+    Pacman-Open-R -> ("Pacman", "Open", "R")
+    Blinky-U      -> ("Blinky", "Normal", "U")
+    Fear-2        -> ("Scared", "2", None)
+    """
+    parts = name.split("-")
+    if actor == "Pacman":
+        return (actor, parts[1], parts[2] if len(parts) > 2 else None)
+    if actor == "Scared":
+        return (actor, parts[-1], None)
+    return (actor, "Normal", parts[-1])
+
+
+sprite_atlas = SpriteAtlas()
@@ -4,6 +4,8 @@
 import pygame
 import os
 import sys
+import threading
+from WallTopology import WallTopology, classify_mask, neighbor_mask
 
 # Добавляем путь к src для импорта Config
 # pac-man-1/TileRenderer.py -> корень проекта -> src
@@ -36,6 +38,27 @@ TILES_DIR = get_tiles_dir()
 _tile_cache = {}
 # Кэш раскрашенных тайлов для каждой темы (ключ: (tile_name, theme_index))
 _colored_tile_cache = {}
+# Кэш пополняет и фоновый поток precompute_theme_tiles: чтение и запись только под замком.
+# recolor_theme_tiles держит его на всю тему, так что главный поток, которому нужна тема,
+# перекрашиваемая в фоне, дожидается ее, а не красит те же тайлы второй раз
+_colored_tile_lock = threading.Lock()
+# Кэш масштабированных тайлов (ключ: (theme_index, tile_size))
+_scaled_tiles_cache = {}
+# Кэш готовых слоев лабиринта (ключ: (map_key, tile_size, theme_index))
+_maze_layer_cache = {}
+
+# Оригинальные цвета в тайлах (из pacman_game.py):
+IMG_EDGE_LIGHT_COLOR = (255, 206, 255, 255)
+IMG_FILL_COLOR = (132, 0, 132, 255)
+IMG_EDGE_SHADOW_COLOR = (255, 0, 255, 255)
+IMG_PELLET_COLOR = (128, 0, 128, 255)
+
+# Тайлы, которые используются при отрисовке карты
+WALL_TILE_NAMES = ["wall-corner-ul", "wall-corner-ur", "wall-corner-ll", "wall-corner-lr",
+                   "wall-straight-horiz", "wall-straight-vert",
+                   "wall-t-top", "wall-t-bottom", "wall-t-left", "wall-t-right",
+                   "wall-x", "wall-end-t", "wall-end-b", "wall-end-l", "wall-end-r",
+                   "wall-nub", "blank"]
 
 def get_theme_colors(theme_index):
     """
@@ -90,116 +113,133 @@ def get_wall_tile_type(map, i, j):
     """
     Определяет тип тайла стены на основе соседних клеток
     Возвращает имя тайла или None если это внутренняя стена (окружена со всех сторон)
+    Для отрисовки всей карты используйте WallTopology - он считает это один раз на карту
     """
     if map[i][j] != '#':
         return None
-    
-    # Проверяем соседние клетки (верх, право, низ, лево)
-    up = i > 0 and map[i - 1][j] == '#'
-    right = j < len(map[0]) - 1 and map[i][j + 1] == '#'
-    down = i < len(map) - 1 and map[i + 1][j] == '#'
-    left = j > 0 and map[i][j - 1] == '#'
-    
-    # Определяем тип стены
-    neighbors = [up, right, down, left]
-    neighbor_count = sum(neighbors)
-    
-    # Если стена окружена со всех 4 сторон - это внутренняя стена, делаем пустое пространство
-    if neighbor_count == 4:
-        return None  # Не отрисовываем внутренние стены
-    
-    if neighbor_count == 0:
-        # Изолированная стена
-        return "wall-nub"
-    elif neighbor_count == 1:
-        # Конец стены (зеркалим)
-        if up:
-            return "wall-end-b"  # Если стена сверху, используем конец снизу
-        elif right:
-            return "wall-end-l"  # Если стена справа, используем конец слева
-        elif down:
-            return "wall-end-t"  # Если стена снизу, используем конец сверху
-        elif left:
-            return "wall-end-r"  # Если стена слева, используем конец справа
-    elif neighbor_count == 2:
-        # Прямая линия или угол
-        if up and down:
-            return "wall-straight-vert"
-        elif left and right:
-            return "wall-straight-horiz"
-        elif up and right:
-            # Угол верх-право - используем противоположный (низ-лево)
-            return "wall-corner-ll"
-        elif right and down:
-            # Угол право-низ - используем противоположный (верх-лево)
-            return "wall-corner-ul"
-        elif down and left:
-            # Угол низ-лево - используем противоположный (верх-право)
-            return "wall-corner-ur"
-        elif left and up:
-            # Угол лево-верх - используем противоположный (низ-право)
-            return "wall-corner-lr"
-    elif neighbor_count == 3:
-        # T-образное соединение
-        if not up:
-            return "wall-t-top"
-        elif not right:
-            return "wall-t-right"
-        elif not down:
-            return "wall-t-bottom"
-        elif not left:
-            return "wall-t-left"
-    
-    # По умолчанию
-    return "wall-straight-horiz"
+    return classify_mask(neighbor_mask(map, i, j))
+
+def get_color_replacements(theme_index):
+    """Пары (оригинальный цвет тайла, цвет темы) для перекраски"""
+    _, edge_light, fill, edge_shadow = get_theme_colors(theme_index)
+    return [
+        (IMG_EDGE_LIGHT_COLOR, edge_light),
+        (IMG_FILL_COLOR, fill),
+        (IMG_EDGE_SHADOW_COLOR, edge_shadow),
+        # Для пеллет используем средний цвет
+        (IMG_PELLET_COLOR, fill),
+    ]
+
+def recolor_surface(surface, theme_index):
+    """
+    Возвращает перекрашенную копию поверхности.
+    Пиксели выбираются масками pygame (точное совпадение RGBA), вся работа идет в C,
+    без попиксельного цикла get_at/set_at
+    """
+    colored = surface.copy()
+    # Все маски строятся по исходной поверхности, чтобы новый цвет
+    # не совпал со следующим заменяемым цветом
+    masks = [
+        (pygame.mask.from_threshold(surface, original, (1, 1, 1, 1)), theme_color)
+        for original, theme_color in get_color_replacements(theme_index)
+    ]
+    for mask, theme_color in masks:
+        mask.to_surface(colored, setcolor=(*theme_color, 255), unsetcolor=None)
+    return colored
 
 def apply_theme_colors(tile_surface, theme_index, tile_name=None):
     """
     Применяет цвета темы к тайлу
     Заменяет цвета тайла на цвета выбранной темы
     """
-    # Проверяем кэш
-    if tile_name and (tile_name, theme_index) in _colored_tile_cache:
-        return _colored_tile_cache[(tile_name, theme_index)]
-    
-    # Оригинальные цвета в тайлах (из pacman_game.py):
-    IMG_EDGE_LIGHT_COLOR = (255, 206, 255, 255)
-    IMG_FILL_COLOR = (132, 0, 132, 255)
-    IMG_EDGE_SHADOW_COLOR = (255, 0, 255, 255)
-    IMG_PELLET_COLOR = (128, 0, 128, 255)
-    
-    # Получаем цвета темы
-    _, edge_light, fill, edge_shadow = get_theme_colors(theme_index)
-    
-    # Создаем копию тайла
-    colored_tile = tile_surface.copy()
-    
-    # Заменяем цвета точно как в старой версии
-    for y in range(colored_tile.get_height()):
-        for x in range(colored_tile.get_width()):
-            pixel = colored_tile.get_at((x, y))
-            r, g, b, a = pixel
-            
-            # Точное сравнение с оригинальными цветами
-            if (r, g, b, a) == IMG_EDGE_LIGHT_COLOR:
-                colored_tile.set_at((x, y), (*edge_light, a))
-            elif (r, g, b, a) == IMG_FILL_COLOR:
-                colored_tile.set_at((x, y), (*fill, a))
-            elif (r, g, b, a) == IMG_EDGE_SHADOW_COLOR:
-                colored_tile.set_at((x, y), (*edge_shadow, a))
-            elif (r, g, b, a) == IMG_PELLET_COLOR:
-                # Для пеллет используем средний цвет
-                colored_tile.set_at((x, y), (*fill, a))
-    
-    # Сохраняем в кэш
-    if tile_name:
-        _colored_tile_cache[(tile_name, theme_index)] = colored_tile
-    
+    if not tile_name:
+        return recolor_surface(tile_surface, theme_index)
+
+    with _colored_tile_lock:
+        # Проверяем кэш
+        colored_tile = _colored_tile_cache.get((tile_name, theme_index))
+        if colored_tile is None:
+            colored_tile = recolor_surface(tile_surface, theme_index)
+            # Сохраняем в кэш
+            _colored_tile_cache[(tile_name, theme_index)] = colored_tile
     return colored_tile
 
-def render_map_with_tiles(screen_map, map_data, tile_size, theme_index=None):
+def recolor_theme_tiles(theme_index, tile_names=WALL_TILE_NAMES):
+    """
+    Перекрашивает все тайлы темы за один проход:
+    тайлы складываются в одну ленту, лента перекрашивается и режется обратно
+    """
+    with _colored_tile_lock:
+        _recolor_theme_tiles_locked(theme_index, tile_names)
+
+def _recolor_theme_tiles_locked(theme_index, tile_names):
+    tiles = []
+    for tile_name in tile_names:
+        tile = load_tile(tile_name)
+        if tile and (tile_name, theme_index) not in _colored_tile_cache:
+            tiles.append((tile_name, tile))
+    if not tiles:
+        return
+
+    strip_w = sum(tile.get_width() for _, tile in tiles)
+    strip_h = max(tile.get_height() for _, tile in tiles)
+    strip = pygame.Surface((strip_w, strip_h), pygame.SRCALPHA)
+    strip.fill((0, 0, 0, 0))
+    x = 0
+    for _, tile in tiles:
+        # BLEND_RGBA_ADD на прозрачную ленту копирует пиксели как есть, включая альфу
+        strip.blit(tile, (x, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        x += tile.get_width()
+
+    colored_strip = recolor_surface(strip, theme_index)
+    x = 0
+    for tile_name, tile in tiles:
+        rect = pygame.Rect(x, 0, tile.get_width(), tile.get_height())
+        _colored_tile_cache[(tile_name, theme_index)] = colored_strip.subsurface(rect).copy()
+        x += tile.get_width()
+
+def precompute_theme_tiles(theme_indices=(1, 2, 3, 4, 5), background=True):
+    """
+    Заранее перекрашивает тайлы всех тем, чтобы смена темы в настройках была мгновенной.
+    Тайлы загружаются в текущем потоке (convert_alpha требует окно),
+    перекраска при background=True идет в фоновом потоке
+    """
+    if pygame.display.get_surface() is None:
+        return None
+    for tile_name in WALL_TILE_NAMES:
+        load_tile(tile_name)
+
+    def work():
+        for theme_index in theme_indices:
+            recolor_theme_tiles(theme_index)
+
+    if not background:
+        work()
+        return None
+    thread = threading.Thread(target=work, name="theme-tiles", daemon=True)
+    thread.start()
+    return thread
+
+def get_scaled_theme_tiles(theme_index, tile_size):
+    """Тайлы темы, масштабированные до tile_size (с кэшированием)"""
+    key = (theme_index, tile_size)
+    if key not in _scaled_tiles_cache:
+        recolor_theme_tiles(theme_index)
+        wall_tiles = {}
+        for tile_name in WALL_TILE_NAMES:
+            tile = load_tile(tile_name)
+            if tile:
+                # Применяем цвета темы (с кэшированием)
+                colored_tile = apply_theme_colors(tile, theme_index, tile_name)
+                # Масштабируем тайл до нужного размера
+                wall_tiles[tile_name] = pygame.transform.scale(colored_tile, (tile_size, tile_size))
+        _scaled_tiles_cache[key] = wall_tiles
+    return _scaled_tiles_cache[key]
+
+def render_map_with_tiles(screen_map, map_data, tile_size, theme_index=None, topology=None):
     """
     Отрисовывает карту используя тайлы из старой версии с цветами выбранной темы
+    topology - готовый WallTopology карты; если не передан, считается здесь
     """
     # Получаем текущую тему из Config, если не указана
     if theme_index is None:
@@ -211,39 +251,42 @@ def render_map_with_tiles(screen_map, map_data, tile_size, theme_index=None):
     # Получаем цвет фона для темы
     bg_color, _, _, _ = get_theme_colors(theme_index)
     
-    # Заливаем экран цветом фона темы
+    # Заливаем экран цветом фона темы (свободные клетки и внутренние стены остаются фоном)
     screen_map.fill(bg_color)
     
-    # Загружаем тайлы
-    wall_tiles = {}
-    for tile_name in ["wall-corner-ul", "wall-corner-ur", "wall-corner-ll", "wall-corner-lr",
-                      "wall-straight-horiz", "wall-straight-vert",
-                      "wall-t-top", "wall-t-bottom", "wall-t-left", "wall-t-right",
-                      "wall-x", "wall-end-t", "wall-end-b", "wall-end-l", "wall-end-r",
-                      "wall-nub", "blank"]:
-        tile = load_tile(tile_name)
-        if tile:
-            # Применяем цвета темы (с кэшированием)
-            colored_tile = apply_theme_colors(tile, theme_index, tile_name)
-            # Масштабируем тайл до нужного размера
-            wall_tiles[tile_name] = pygame.transform.scale(colored_tile, (tile_size, tile_size))
+    # Загружаем тайлы темы нужного размера
+    wall_tiles = get_scaled_theme_tiles(theme_index, tile_size)
     
-    # Отрисовываем карту
-    for i in range(len(map_data)):
-        for j in range(len(map_data[0])):
-            x = j * tile_size
-            y = i * tile_size
-            
-            if map_data[i][j] == '#':
-                # Определяем тип тайла для стены
-                tile_type = get_wall_tile_type(map_data, i, j)
-                # Если tile_type == None, значит это внутренняя стена - не отрисовываем
-                if tile_type and tile_type in wall_tiles:
-                    screen_map.blit(wall_tiles[tile_type], (x, y))
-                else:
-                    # Внутренняя стена или неизвестный тип - рисуем фон темы
-                    pygame.draw.rect(screen_map, bg_color, (x, y, tile_size, tile_size))
-            elif map_data[i][j] in ['O', 'U', 'p', 'g', 'p1', 'p2']:
-                # Свободное пространство - используем фон темы
-                pygame.draw.rect(screen_map, bg_color, (x, y, tile_size, tile_size))
+    if topology is None:
+        topology = WallTopology(map_data)
+
+    # Отрисовываем стены по готовому индексу тайлов
+    for i, j, tile_type in topology.wall_tiles():
+        tile = wall_tiles.get(tile_type)
+        if tile:
+            screen_map.blit(tile, (j * tile_size, i * tile_size))
 
+def get_maze_layer(map_data, tile_size, theme_index, map_key, size, topology=None):
+    """
+    Возвращает заранее отрисованный слой лабиринта.
+    Стены не меняются во время уровня, поэтому слой строится один раз
+    для (map_key, tile_size, theme_index) и дальше только копируется на экран.
+    map_key - идентификатор карты, который меняется при каждой новой карте
+    """
+    key = (map_key, tile_size, theme_index)
+    layer = _maze_layer_cache.get(key)
+    if layer is None or layer.get_size() != tuple(size):
+        layer = pygame.Surface(size)
+        render_map_with_tiles(layer, map_data, tile_size, theme_index, topology)
+        _maze_layer_cache[key] = layer
+    return layer
+def invalidate_maze_layer(map_key=None):
+    """
+    Сбрасывает кэш слоев лабиринта.
+    Без аргумента очищает весь кэш, иначе только слои указанной карты
+    """
+    if map_key is None:
+        _maze_layer_cache.clear()
+        return
+    for key in [key for key in _maze_layer_cache if key[0] == map_key]:
+        del _maze_layer_cache[key]
@@ -0,0 +1,141 @@
+"""
+Индекс топологии стен карты.
+Считается один раз после создания карты: для каждой клетки хранится
+4-битная маска соседей-стен и id тайла, которым эта клетка рисуется.
+Рендерер (и любые другие потребители - миникарта, экспорт) берут тайл
+из индекса вместо повторной классификации соседей на каждом кадре.
+"""
+
+# Биты маски соседей
+UP = 1
+RIGHT = 2
+DOWN = 4
+LEFT = 8
+
+# id тайла -> имя тайла (0 - клетка без тайла: не стена или внутренняя стена)
+TILE_NAMES = (
+    None,
+    "wall-nub",
+    "wall-end-t", "wall-end-r", "wall-end-b", "wall-end-l",
+    "wall-straight-vert", "wall-straight-horiz",
+    "wall-corner-ul", "wall-corner-ur", "wall-corner-ll", "wall-corner-lr",
+    "wall-t-top", "wall-t-right", "wall-t-bottom", "wall-t-left",
+)
+TILE_IDS = {name: tile_id for tile_id, name in enumerate(TILE_NAMES)}
+
+
+def classify_mask(mask):
+    """
+    Определяет тайл стены по маске соседей-стен.
+    Возвращает имя тайла или None если это внутренняя стена (окружена со всех сторон)
+    """
+    up = bool(mask & UP)
+    right = bool(mask & RIGHT)
+    down = bool(mask & DOWN)
+    left = bool(mask & LEFT)
+    neighbor_count = up + right + down + left
+
+    # Если стена окружена со всех 4 сторон - это внутренняя стена, не отрисовываем
+    if neighbor_count == 4:
+        return None
+    if neighbor_count == 0:
+        # Изолированная стена
+        return "wall-nub"
+    if neighbor_count == 1:
+        # Конец стены (зеркалим)
+        if up:
+            return "wall-end-b"
+        if right:
+            return "wall-end-l"
+        if down:
+            return "wall-end-t"
+        return "wall-end-r"
+    if neighbor_count == 2:
+        # Прямая линия или угол (угол берется противоположный)
+        if up and down:
+            return "wall-straight-vert"
+        if left and right:
+            return "wall-straight-horiz"
+        if up and right:
+            return "wall-corner-ll"
+        if right and down:
+            return "wall-corner-ul"
+        if down and left:
+            return "wall-corner-ur"
+        return "wall-corner-lr"
+    # T-образное соединение
+    if not up:
+        return "wall-t-top"
+    if not right:
+        return "wall-t-right"
+    if not down:
+        return "wall-t-bottom"
+    return "wall-t-left"
+
+
+# Маска соседей -> id тайла, считается один раз при импорте
+MASK_TO_TILE = bytes(TILE_IDS[classify_mask(mask)] for mask in range(16))
+
+
+def neighbor_mask(map, i, j):
+    """4-битная маска соседей-стен клетки (i, j)"""
+    mask = 0
+    if i > 0 and map[i - 1][j] == '#':
+        mask |= UP
+    if j < len(map[0]) - 1 and map[i][j + 1] == '#':
+        mask |= RIGHT
+    if i < len(map) - 1 and map[i + 1][j] == '#':
+        mask |= DOWN
+    if j > 0 and map[i][j - 1] == '#':
+        mask |= LEFT
+    return mask
+
+
+class WallTopology:
+    def __init__(self, map):
+        self.height = len(map)
+        self.width = len(map[0])
+        self.masks = bytearray(self.width * self.height)
+        self.tiles = bytearray(self.width * self.height)
+        self.rebuild(map)
+
+    def rebuild(self, map):
+        """Полный пересчет индекса"""
+        for i in range(self.height):
+            for j in range(self.width):
+                self._update_one(map, i, j)
+
+    def update_cells(self, map, cells):
+        """Пересчитывает индекс для измененных клеток и их соседей (например, ворота дома призраков)"""
+        for i, j in cells:
+            for di, dj in ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)):
+                ni = i + di
+                nj = j + dj
+                if 0 <= ni < self.height and 0 <= nj < self.width:
+                    self._update_one(map, ni, nj)
+
+    def _update_one(self, map, i, j):
+        index = i * self.width + j
+        if map[i][j] == '#':
+            mask = neighbor_mask(map, i, j)
+            self.masks[index] = mask
+            self.tiles[index] = MASK_TO_TILE[mask]
+        else:
+            self.masks[index] = 0
+            self.tiles[index] = 0
+
+    def mask(self, i, j):
+        return self.masks[i * self.width + j]
+
+    def tile_id(self, i, j):
+        return self.tiles[i * self.width + j]
+
+    def tile_name(self, i, j):
+        return TILE_NAMES[self.tiles[i * self.width + j]]
+
+    def wall_tiles(self):
+        """Итерирует (i, j, имя тайла) по всем клеткам, которые нужно рисовать тайлом"""
+        width = self.width
+        for index, tile_id in enumerate(self.tiles):
+            if tile_id:
+                yield index // width, index % width, TILE_NAMES[tile_id]
@@ -24,11 +24,30 @@ a = Analysis(
         'FoodPiece',
         'MapGenarator',
         'TileRenderer',
+        'SpriteAtlas',
+        'WallTopology',
+        'Maze',
+        'RecordsStore',
+        'GameClock',
+        'Simulation',
+        'Replay',
+        'MapPool',
+        'MapCache',
         'Variables',
         'DB_communicator',
         'socketio.client',
         'engineio.client',
         'src.utils.path_helper',
+        'src.utils.font_cache',
+        'src.utils.api_client',
+        'src.utils.response_cache',
+        'src.utils.sorted_leaderboard',
+        'src.utils.sorting',
+        'src.utils.sort_benchmark',
+        'src.utils.leaderboard_index',
+        'src.widgets.virtual_list',
+        'src.utils.leaderboard_client',
+        'src.utils.score_queue',
     ],
     hookspath=[],
     hooksconfig={},
@@ -1,21 +1,24 @@
 import pygame
 import sys
 import os
-import requests
 import random
-import time
-import copy
 from src.pages._base import Page
 from src.widgets._base import Widget
 from src.widgets.button import Button
+from src.widgets.virtual_list import VirtualList
 from src.utils.image import image_cache_manager
 from src.utils.config import Config
+from src.utils.font_cache import get_font, render_text
 from src.utils.music_manager import music_manager
+from src.utils.leaderboard_client import LeaderboardClient
+from src.utils.sort_benchmark import start_benchmark_process, SIZE_LIMITS
+from src.utils.sorted_leaderboard import SortedLeaderboard
 
 from src.utils.path_helper import get_base_dir
 BASE_DIR = get_base_dir()
 ASSETS_DIR = os.path.join(BASE_DIR, "Assets")
 FONT_PATH = os.path.join(ASSETS_DIR, "fonts", "Jersey_10", "Jersey10-Regular.ttf")
+ERROR_BANNER_CHARS = 60  # Longer errors are cut so the banner does not run into the scroll indicator
 
 class Leaderboard(Page):
     def __init__(self, image, base_w, base_h):
@@ -30,16 +33,18 @@ class Leaderboard(Page):
             self.back_but
         ]
         
-        # Leaderboard data
-        self.leaderboard_data = []
+        # Leaderboard state (the rows themselves are self.leaderboard_data, set with the client below)
         self.loading = False
+        self.refreshing = False
         self.error_message = None
         self.last_update_time = 0
         self.update_interval = 5000  # Update every 5 seconds
         
         # Scrolling
-        self.scroll_offset = 0
         self.max_visible_rows = 10  # Maximum rows visible at once
+        self.rows = VirtualList(self._render_row, self._row_key, self.max_visible_rows)
+        # (font, rank x, name x, score x) relative to the row, set every frame in _draw_leaderboard
+        self._row_layout = None
         
         # Current player data
         self.current_player_rank = None  # Will be fetched from API
@@ -47,8 +52,16 @@ class Leaderboard(Page):
         self.current_player_score = None  # Will be fetched from API
         self.player_data_loaded = False
         
-        # API URL (default to localhost, can be configured)
-        self.api_url = "http://localhost:3000"
+        # Local-only mode: leaderboard from the local records database (L key)
+        self.local_mode = False
+        
+        # Background client over the shared API session (URL is set in src/utils/api_client.py)
+        self.client = LeaderboardClient()
+        self.snapshot_version = 0
+        # Rows and the current player's rank both come from one SortedLeaderboard:
+        # the client's board (updated by its worker) or a board of local records
+        self.leaderboard_data = self.client.board
+        self.rows.set_items(self.leaderboard_data)
         
         # Font
         self.font_path = FONT_PATH if os.path.isfile(FONT_PATH) else None
@@ -59,17 +72,14 @@ class Leaderboard(Page):
             'heap': None,
             'radix': None
         }
+        self.sort_sizes = {}  # Number of entries each result was measured on
+        self.sort_running = None  # Algorithm currently being benchmarked
+        self.sort_future = None  # Result of the benchmark process, polled every frame
         self.sort_button_rects = {}  # Will store button rectangles
     
     def _init_font(self, size=36):
         """Initialize font"""
-        try:
-            if self.font_path:
-                return pygame.font.Font(self.font_path, size)
-            else:
-                return pygame.font.Font(None, size)
-        except Exception:
-            return pygame.font.SysFont('arial', size)
+        return get_font(self.font_path, size)
     
     def _draw_current_player_row(self, surface, window_size, scale_w, scale_h, text_scale):
         """Draw fixed row with current player's information at the bottom"""
@@ -91,137 +101,69 @@ class Leaderboard(Page):
         pygame.draw.rect(surface, color_highlight, row_bg, 3)  # Highlight border
         
         # Label
-        label_text = font_entry.render("Your Position:", True, color_highlight)
+        label_text = render_text(font_entry, "Your Position:", color_highlight)
         label_x = row_x + int(20 * scale_w)
         label_y = row_y + (row_height - label_text.get_height()) // 2
         surface.blit(label_text, (label_x, label_y))
         
+        # Rank and score come from the shown board, same as the rows; only a player
+        # who is not on the board gets the rank from the API (not available in local mode)
+        player_rank = self.leaderboard_data.rank_of(self.current_player_username)
+        player_score = self.leaderboard_data.score_of(self.current_player_username)
+        if player_rank is None and not self.local_mode:
+            player_rank = self.current_player_rank
+            player_score = self.current_player_score
+        
         # Rank
         rank_x = row_x + int(200 * scale_w)
-        if self.current_player_rank is not None:
-            rank_text = font_entry.render(f"#{self.current_player_rank}", True, color_white)
+        if player_rank is not None:
+            rank_text = render_text(font_entry, f"#{player_rank}", color_white)
         else:
-            rank_text = font_entry.render("-", True, color_gray)
+            rank_text = render_text(font_entry, "-", color_gray)
         surface.blit(rank_text, (rank_x, label_y))
         
         # Username
         name_x = row_x + int(350 * scale_w)
-        name_text = font_entry.render(str(self.current_player_username)[:20], True, color_white)
+        name_text = render_text(font_entry, str(self.current_player_username)[:20], color_white)
         surface.blit(name_text, (name_x, label_y))
         
         # Score
         score_x = row_x + int(800 * scale_w)
-        if self.current_player_score is not None:
-            score_text = font_entry.render(str(self.current_player_score), True, color_yellow)
+        if player_score is not None:
+            score_text = render_text(font_entry, str(player_score), color_yellow)
         else:
-            score_text = font_entry.render("-", True, color_gray)
+            score_text = render_text(font_entry, "-", color_gray)
         surface.blit(score_text, (score_x, label_y))
     
-    def insertion_sort(self, arr, key_func):
-        """Insertion Sort algorithm (descending order for leaderboard)"""
-        arr = copy.deepcopy(arr)
-        for i in range(1, len(arr)):
-            key = arr[i]
-            j = i - 1
-            while j >= 0 and key_func(arr[j]) < key_func(key):  # Descending: higher score first
-                arr[j + 1] = arr[j]
-                j -= 1
-            arr[j + 1] = key
-        return arr
-    
-    def heap_sort(self, arr, key_func):
-        """Heap Sort algorithm (descending order for leaderboard)"""
-        arr = copy.deepcopy(arr)
-        
-        def heapify(arr, n, i):
-            largest = i
-            left = 2 * i + 1
-            right = 2 * i + 2
-            
-            if left < n and key_func(arr[left]) > key_func(arr[largest]):
-                largest = left
-            if right < n and key_func(arr[right]) > key_func(arr[largest]):
-                largest = right
-            if largest != i:
-                arr[i], arr[largest] = arr[largest], arr[i]
-                heapify(arr, n, largest)
-        
-        n = len(arr)
-        for i in range(n // 2 - 1, -1, -1):
-            heapify(arr, n, i)
-        for i in range(n - 1, 0, -1):
-            arr[0], arr[i] = arr[i], arr[0]
-            heapify(arr, i, 0)
-        # Reverse for descending order (highest score first)
-        return list(reversed(arr))
-    
-    def radix_sort(self, arr, key_func):
-        """Radix Sort algorithm (for integers, descending order for leaderboard)"""
-        arr = copy.deepcopy(arr)
-        if not arr:
-            return arr
-        
-        # Get max value to determine number of digits
-        max_val = max(key_func(item) for item in arr)
-        exp = 1
-        
-        while max_val // exp > 0:
-            # Counting sort for each digit
-            count = [0] * 10
-            output = [None] * len(arr)
-            
-            # Count occurrences
-            for item in arr:
-                index = (key_func(item) // exp) % 10
-                count[index] += 1
-            
-            # Change count to position
-            for i in range(1, 10):
-                count[i] += count[i - 1]
-            
-            # Build output array
-            for i in range(len(arr) - 1, -1, -1):
-                index = (key_func(arr[i]) // exp) % 10
-                output[count[index] - 1] = arr[i]
-                count[index] -= 1
-            
-            arr = output
-            exp *= 10
-        
-        # Reverse for descending order (highest score first)
-        return list(reversed(arr))
-    
     def test_sort_algorithm(self, sort_type):
-        """Test a sorting algorithm on shuffled leaderboard data"""
-        if not self.leaderboard_data:
-            return None
-        
-        # Create a copy and shuffle
-        test_data = copy.deepcopy(self.leaderboard_data)
+        """Benchmark a sorting algorithm on shuffled leaderboard data in a separate process"""
+        if not self.leaderboard_data or self.sort_running is not None:
+            return
+        # Slow algorithms are measured on a prefix so the benchmark finishes in reasonable time
+        limit = SIZE_LIMITS.get(sort_type, len(self.leaderboard_data))
+        test_data = self.leaderboard_data.rows(0, limit)
         random.shuffle(test_data)
-        
-        # Key function to extract score for sorting
-        def get_score(item):
-            if isinstance(item, dict):
-                return item.get('score', 0)
-            return 0
-        
-        # Measure time
-        start_time = time.perf_counter()
-        
-        if sort_type == 'insertion':
-            sorted_data = self.insertion_sort(test_data, get_score)
-        elif sort_type == 'heap':
-            sorted_data = self.heap_sort(test_data, get_score)
-        elif sort_type == 'radix':
-            sorted_data = self.radix_sort(test_data, get_score)
-        else:
-            return None
-        
-        end_time = time.perf_counter()
-        elapsed_time = (end_time - start_time) * 1000  # Convert to milliseconds
-        
-        return elapsed_time
+        try:
+            self.sort_future = start_benchmark_process(sort_type, test_data, trials=5)
+        except (OSError, RuntimeError) as e:
+            print(f"[Leaderboard] Could not start sort benchmark: {str(e)}")
+            return
+        self.sort_running = sort_type
+    
+    def _poll_sort_benchmark(self):
+        """Pick up the benchmark result once the process has finished"""
+        if self.sort_future is None or not self.sort_future.done():
+            return
+        sort_type = self.sort_running
+        try:
+            result = self.sort_future.result()
+            self.sort_times[sort_type] = result['median_ms']
+            self.sort_sizes[sort_type] = result['size']
+        except Exception as e:
+            print(f"[Leaderboard] Sort benchmark failed: {str(e)}")
+        finally:
+            self.sort_future = None
+            self.sort_running = None
     
     def _draw_sort_buttons(self, surface):
         """Draw sorting test buttons on the right side"""
@@ -273,7 +215,7 @@ class Leaderboard(Page):
             pygame.draw.rect(surface, color_border, button_rect, 2)
             
             # Draw text
-            text_surface = font_button.render(label, True, color_yellow)
+            text_surface = render_text(font_button, label, color_yellow)
             text_x = start_x + (button_width - text_surface.get_width()) // 2
             text_y = button_y + (button_height - text_surface.get_height()) // 2
             surface.blit(text_surface, (text_x, text_y))
@@ -285,98 +227,113 @@ class Leaderboard(Page):
             result_y = results_y + i * int(25 * scale_h)
             time_value = self.sort_times.get(sort_type)
             
-            if time_value is not None:
-                result_text = f"{label}: {time_value:.4f} ms"
+            if self.sort_running == sort_type:
+                result_text = f"{label}: running..."
+                color = color_white
+            elif time_value is not None:
+                result_text = f"{label}: {time_value:.4f} ms ({self.sort_sizes.get(sort_type)} entries)"
                 color = color_yellow
             else:
                 result_text = f"{label}: -"
                 color = color_gray
             
-            text_surface = font_result.render(result_text, True, color)
+            text_surface = render_text(font_result, result_text, color)
             surface.blit(text_surface, (start_x, result_y))
     
-    def fetch_leaderboard(self):
-        """Fetch leaderboard data from API"""
-        try:
-            url = f"{self.api_url}/leaderboard"
-            print(f"[Leaderboard] Fetching from {url}")
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"[Leaderboard] Received data: {data}")
-                
-                # Expected format: list of {username, score} or {rank, username, score}
-                if isinstance(data, list):
-                    self.leaderboard_data = data
-                elif isinstance(data, dict) and 'leaderboard' in data:
-                    self.leaderboard_data = data['leaderboard']
-                else:
-                    self.leaderboard_data = []
-                    print(f"[Leaderboard] Unexpected data format: {data}")
-                
-                self.error_message = None
-                return True
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                error_msg = error_data.get('message', f'Error {response.status_code}')
-                self.error_message = error_msg
-                print(f"[Leaderboard] Error {response.status_code}: {error_msg}")
-                return False
-        except requests.exceptions.RequestException as e:
-            self.error_message = f"Connection error: {str(e)}"
-            print(f"[Leaderboard] Request exception: {str(e)}")
-            return False
-        except Exception as e:
-            self.error_message = f"Error: {str(e)}"
-            print(f"[Leaderboard] Exception: {str(e)}")
-            return False
-    
-    def fetch_player_data(self, username):
-        """Fetch current player's rank and score from API"""
+    def _apply_snapshot(self):
+        """Copy the latest background fetch results into the page state"""
+        if self.local_mode:
+            self.loading = False
+            self.refreshing = False
+            return
+        snapshot = self.client.snapshot()
+        # Show the "Loading..." placeholder only until the first data arrives
+        self.loading = snapshot.loading and not snapshot.has_data
+        self.refreshing = snapshot.loading
+        if snapshot.version == self.snapshot_version:
+            return
+        self.snapshot_version = snapshot.version
+        # The worker already updated the board in place; rows whose rank, name and
+        # score did not change keep their cached surfaces, only the scroll range is rechecked
+        self.rows.set_items(self.leaderboard_data)
+        self.error_message = snapshot.error_message
+        if snapshot.player is not None:
+            self.current_player_rank = snapshot.player['rank']
+            self.current_player_score = snapshot.player['score']
+            self.player_data_loaded = True
+
+    def _load_local_leaderboard(self):
+        """Best score of every player from the local records database"""
         try:
-            url = f"{self.api_url}/leaderboard/player/{username}"
-            print(f"[Leaderboard] Fetching player data from {url}")
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"[Leaderboard] Player data received: {data}")
-                
-                # Expected format: {rank, username, score} or similar
-                if isinstance(data, dict):
-                    self.current_player_rank = data.get('rank', None)
-                    self.current_player_score = data.get('score', None)
-                    self.player_data_loaded = True
-                    return True
-                else:
-                    print(f"[Leaderboard] Unexpected player data format: {data}")
-                    self.current_player_rank = None
-                    self.current_player_score = None
-                    self.player_data_loaded = True
-                    return False
-            elif response.status_code == 404:
-                # Player not found - set to None to show "-"
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                error_msg = error_data.get('message', 'Player not found')
-                print(f"[Leaderboard] Player not found (404): {error_msg}")
-                self.current_player_rank = None
-                self.current_player_score = None
-                self.player_data_loaded = True
-                return True  # Not an error, just player not in leaderboard
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                error_msg = error_data.get('message', f'Error {response.status_code}')
-                print(f"[Leaderboard] Error {response.status_code} fetching player data: {error_msg}")
-                # Don't set error_message here, just log it
-                return False
-        except requests.exceptions.RequestException as e:
-            print(f"[Leaderboard] Request exception fetching player data: {str(e)}")
-            return False
+            # DB_communicator lives in pac-man-1 (already on sys.path, see singleplayer.py)
+            from DB_communicator import score_store
+            score_store.load()
+            best_scores = score_store.records.best_scores()
         except Exception as e:
-            print(f"[Leaderboard] Exception fetching player data: {str(e)}")
-            return False
+            print(f"[Leaderboard] Could not read local records: {str(e)}")
+            self.error_message = f"Local records error: {str(e)}"
+            return
+        self.error_message = None
+        self.leaderboard_data = SortedLeaderboard()
+        self.leaderboard_data.replace_all(
+            {'username': username, 'score': score} for username, score in best_scores.items())
+        self.rows.set_items(self.leaderboard_data)
+
+    def toggle_local_mode(self):
+        """Switch between the global (API) and the local-only leaderboard"""
+        self.local_mode = not self.local_mode
+        self.rows.scroll_to(0)
+        if self.local_mode:
+            self._load_local_leaderboard()
+        else:
+            # Force the next _apply_snapshot to take the online data again
+            self.snapshot_version = -1
+            self.leaderboard_data = self.client.board
+            self.rows.set_items(self.leaderboard_data)
+            self._apply_snapshot()
+
+    def refresh(self, force=False):
+        """Request leaderboard and player data without blocking the render loop"""
+        self.client.refresh(self.current_player_username, force)
+        self.last_update_time = pygame.time.get_ticks()
     
+    @staticmethod
+    def _entry_fields(entry, i):
+        rank = entry.get('rank', i + 1) if isinstance(entry, dict) else i + 1
+        username = entry.get('username', 'Unknown') if isinstance(entry, dict) else 'Unknown'
+        score = entry.get('score', 0) if isinstance(entry, dict) else 0
+        return rank, username, score
+
+    def _row_key(self, entry, i):
+        if entry is None:
+            return (self._row_layout[0], None)
+        return (self._row_layout[0],) + self._entry_fields(entry, i)
+
+    def _render_row(self, entry, i, width, height):
+        """Render one leaderboard row to its own surface"""
+        font_entry, rank_x, name_x, score_x = self._row_layout
+        color_yellow = (255, 255, 0)
+        color_white = (255, 255, 255)
+        row = pygame.Surface((width, height), pygame.SRCALPHA)
+        
+        # Alternate row background
+        if i % 2 == 0:
+            row.fill((30, 30, 30))
+        # The board shrank after the list was measured: empty row until the next frame
+        if entry is None:
+            return row
+        
+        rank, username, score = self._entry_fields(entry, i)
+        rank_text = font_entry.render(f"#{rank}", True, color_white)
+        name_text = font_entry.render(str(username)[:20], True, color_white)  # Limit username length
+        score_text = font_entry.render(str(score), True, color_yellow)
+        
+        text_y = (height - rank_text.get_height()) // 2
+        row.blit(rank_text, (rank_x, text_y))
+        row.blit(name_text, (name_x, text_y))
+        row.blit(score_text, (score_x, text_y))
+        return row
+
     def _draw_leaderboard(self, surface):
         """Draw leaderboard table"""
         window_size = surface.get_size()
@@ -397,11 +354,17 @@ class Leaderboard(Page):
         color_error = (255, 0, 0)
         
         # Title
-        title = font_title.render("Global Leaderboard", True, color_yellow)
+        title = render_text(font_title, "Local Leaderboard" if self.local_mode else "Global Leaderboard", color_yellow)
         title_x = int(640 * scale_w) - title.get_width() // 2
         title_y = int(150 * scale_h)
         surface.blit(title, (title_x, title_y))
         
+        # Background refresh indicator (the table stays visible meanwhile)
+        if self.refreshing and not self.loading:
+            updating_text = render_text(font_error, "Updating...", color_gray)
+            surface.blit(updating_text, (title_x + title.get_width() + int(20 * scale_w),
+                                         title_y + title.get_height() - updating_text.get_height()))
+        
         # Table position
         table_start_x = int(400 * scale_w)
         table_start_y = int(250 * scale_h)
@@ -413,9 +376,9 @@ class Leaderboard(Page):
         pygame.draw.rect(surface, (40, 40, 40), header_bg)
         pygame.draw.rect(surface, color_yellow, header_bg, 2)
         
-        rank_header = font_header.render("Rank", True, color_yellow)
-        name_header = font_header.render("Username", True, color_yellow)
-        score_header = font_header.render("Score", True, color_yellow)
+        rank_header = render_text(font_header, "Rank", color_yellow)
+        name_header = render_text(font_header, "Username", color_yellow)
+        score_header = render_text(font_header, "Score", color_yellow)
         
         rank_x = table_start_x + int(20 * scale_w)
         name_x = table_start_x + int(200 * scale_w)
@@ -426,9 +389,16 @@ class Leaderboard(Page):
         surface.blit(name_header, (name_x, header_y))
         surface.blit(score_header, (score_x, header_y))
         
-        # Error message
-        if self.error_message:
-            error_text = font_error.render(self.error_message, True, color_error)
+        # Error message: a failed revalidation keeps the cached rows and only shows a banner above the table
+        if self.error_message and self.leaderboard_data:
+            font_banner = self._init_font(int(22 * text_scale))
+            message = self.error_message
+            if len(message) > ERROR_BANNER_CHARS:
+                message = message[:ERROR_BANNER_CHARS - 3] + "..."
+            banner_text = render_text(font_banner, message, color_error)
+            surface.blit(banner_text, (table_start_x + int(20 * scale_w), table_start_y - int(30 * scale_h)))
+        elif self.error_message:
+            error_text = render_text(font_error, self.error_message, color_error)
             error_x = int(640 * scale_w) - error_text.get_width() // 2
             error_y = table_start_y + int(100 * scale_h)
             surface.blit(error_text, (error_x, error_y))
@@ -436,7 +406,7 @@ class Leaderboard(Page):
         
         # Loading message
         if self.loading:
-            loading_text = font_entry.render("Loading...", True, color_gray)
+            loading_text = render_text(font_entry, "Loading...", color_gray)
             loading_x = int(640 * scale_w) - loading_text.get_width() // 2
             loading_y = table_start_y + int(100 * scale_h)
             surface.blit(loading_text, (loading_x, loading_y))
@@ -444,50 +414,22 @@ class Leaderboard(Page):
         
         # No data message
         if not self.leaderboard_data:
-            no_data_text = font_entry.render("No leaderboard data available", True, color_gray)
+            no_data_text = render_text(font_entry, "No leaderboard data available", color_gray)
             no_data_x = int(640 * scale_w) - no_data_text.get_width() // 2
             no_data_y = table_start_y + int(100 * scale_h)
             surface.blit(no_data_text, (no_data_x, no_data_y))
             return
         
-        # Leaderboard entries with scrolling
-        total_entries = len(self.leaderboard_data)
-        max_scroll = max(0, total_entries - self.max_visible_rows)
-        self.scroll_offset = min(self.scroll_offset, max_scroll)
-        self.scroll_offset = max(0, self.scroll_offset)
-        
-        visible_start = self.scroll_offset
-        visible_end = min(visible_start + self.max_visible_rows, total_entries)
-        
-        for i in range(visible_start, visible_end):
-            entry = self.leaderboard_data[i]
-            display_index = i - visible_start
-            row_y = table_start_y + row_height + (display_index * row_height)
-            
-            # Alternate row background
-            if i % 2 == 0:
-                row_bg = pygame.Rect(table_start_x, row_y, table_width, row_height)
-                pygame.draw.rect(surface, (30, 30, 30), row_bg)
-            
-            # Get data
-            rank = entry.get('rank', i + 1) if isinstance(entry, dict) else i + 1
-            username = entry.get('username', 'Unknown') if isinstance(entry, dict) else str(entry.get('username', 'Unknown'))
-            score = entry.get('score', 0) if isinstance(entry, dict) else entry.get('score', 0)
-            
-            # Render text
-            rank_text = font_entry.render(f"#{rank}", True, color_white)
-            name_text = font_entry.render(str(username)[:20], True, color_white)  # Limit username length
-            score_text = font_entry.render(str(score), True, color_yellow)
-            
-            # Position text
-            rank_y = row_y + (row_height - rank_text.get_height()) // 2
-            surface.blit(rank_text, (rank_x, rank_y))
-            surface.blit(name_text, (name_x, rank_y))
-            surface.blit(score_text, (score_x, rank_y))
+        # Leaderboard entries: virtualized list, each row is rendered once and blitted afterwards
+        self._row_layout = (font_entry, rank_x - table_start_x, name_x - table_start_x, score_x - table_start_x)
+        self.rows.set_row_size(table_width, row_height)
+        self.rows.draw(surface, table_start_x, table_start_y + row_height)
         
         # Draw scroll indicator if needed
+        total_entries = len(self.leaderboard_data)
         if total_entries > self.max_visible_rows:
-            scroll_indicator = font_entry.render(f"Scroll: {self.scroll_offset + 1}-{visible_end} of {total_entries}", True, color_gray)
+            visible_start, visible_end = self.rows.visible_range()
+            scroll_indicator = render_text(font_entry, f"Scroll: {visible_start + 1}-{visible_end} of {total_entries}", color_gray)
             indicator_x = table_start_x + table_width - scroll_indicator.get_width() - int(20 * scale_w)
             indicator_y = table_start_y - int(30 * scale_h)
             surface.blit(scroll_indicator, (indicator_x, indicator_y))
@@ -503,30 +445,24 @@ class Leaderboard(Page):
         from src.utils.settings_manager import settings_manager
         self.current_player_username = settings_manager.get_setting("username", "Player123")
         
-        # Initial fetch
-        self.loading = True
-        self.fetch_leaderboard()
-        # Fetch player data if username is available
-        if self.current_player_username:
-            self.fetch_player_data(self.current_player_username)
-        self.loading = False
-        self.last_update_time = pygame.time.get_ticks()
+        # Show the cached leaderboard on the first frame, revalidate in the background
+        self.client.load_cached(self.current_player_username)
+        self._apply_snapshot()
+        self.refresh()
 
         while True:
             current_time = pygame.time.get_ticks()
             
             # Auto-refresh every update_interval
             if current_time - self.last_update_time > self.update_interval:
-                self.loading = True
-                self.fetch_leaderboard()
-                # Refresh player data too
-                if self.current_player_username:
-                    self.fetch_player_data(self.current_player_username)
-                self.loading = False
-                self.last_update_time = current_time
+                self.refresh()
+
+            self._apply_snapshot()
+            self._poll_sort_benchmark()
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.client.save_cache()
                     pygame.quit()
                     sys.exit()
                 elif event.type == pygame.VIDEORESIZE:
@@ -539,36 +475,28 @@ class Leaderboard(Page):
                         mouse_pos = event.pos
                         for sort_type, button_rect in self.sort_button_rects.items():
                             if button_rect.collidepoint(mouse_pos):
-                                # Test the sorting algorithm
-                                elapsed_time = self.test_sort_algorithm(sort_type)
-                                if elapsed_time is not None:
-                                    self.sort_times[sort_type] = elapsed_time
+                                # Benchmark the sorting algorithm (median of 5 runs, off the UI thread)
+                                self.test_sort_algorithm(sort_type)
                                 break
                 elif event.type == pygame.MOUSEWHEEL:
                     # Scroll leaderboard
-                    if len(self.leaderboard_data) > self.max_visible_rows:
-                        scroll_amount = event.y * 3  # Scroll 3 rows at a time
-                        self.scroll_offset = max(0, min(self.scroll_offset - scroll_amount, 
-                                                       len(self.leaderboard_data) - self.max_visible_rows))
+                    self.rows.scroll_by(-event.y * 3)  # Scroll 3 rows at a time
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_r:
-                        # Manual refresh with R key
-                        self.loading = True
-                        self.fetch_leaderboard()
-                        # Refresh player data too
-                        if self.current_player_username:
-                            self.fetch_player_data(self.current_player_username)
-                        self.loading = False
-                        self.last_update_time = pygame.time.get_ticks()
+                        # Manual refresh with R key (coalesced with a running one)
+                        if self.local_mode:
+                            self._load_local_leaderboard()
+                        else:
+                            self.refresh(force=True)
+                    elif event.key == pygame.K_l:
+                        # L switches between the global and the local-only leaderboard
+                        self.toggle_local_mode()
                     elif event.key == pygame.K_UP:
                         # Scroll up
-                        if len(self.leaderboard_data) > self.max_visible_rows:
-                            self.scroll_offset = max(0, self.scroll_offset - 1)
+                        self.rows.scroll_by(-1)
                     elif event.key == pygame.K_DOWN:
                         # Scroll down
-                        if len(self.leaderboard_data) > self.max_visible_rows:
-                            self.scroll_offset = min(self.scroll_offset + 1, 
-                                                     len(self.leaderboard_data) - self.max_visible_rows)
+                        self.rows.scroll_by(1)
 
             self.draw(surface)
             self.deco1.draw(surface)
@@ -581,6 +509,8 @@ class Leaderboard(Page):
             self._draw_sort_buttons(surface)
 
             if self.back_but.draw(surface):
+                # The board is written to the response cache on a timer; save what is newer on leaving
+                self.client.save_cache()
                 return "menu"
             
             # Отрисовка и обработка иконки звука
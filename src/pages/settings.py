@@ -7,6 +7,7 @@ from src.widgets.button import Button
 from src.widgets.slider import Slider
 from src.utils.image import image_cache_manager
 from src.utils.config import Config
+from src.utils.font_cache import get_font, render_text
 from src.utils.music_manager import music_manager
 from src.utils.settings_manager import settings_manager
 
@@ -51,13 +52,7 @@ class Settings(Page):
 
     def _init_font(self, size=36):
         """Инициализация шрифта"""
-        try:
-            if self.font_path:
-                return pygame.font.Font(self.font_path, size)
-            else:
-                return pygame.font.Font(None, size)
-        except Exception:
-            return pygame.font.SysFont('arial', size)
+        return get_font(self.font_path, size)
     
     def _draw_username_input(self, surface):
         """Отрисовка поля ввода username"""
@@ -107,7 +102,7 @@ class Settings(Page):
         display_text = self.username + ("|" if self.username_input_active else "")
         font_size = int(54 * min(scale_w, scale_h))  # 36 * 1.5 = 54
         font = self._init_font(font_size)
-        text_surface = font.render(display_text, True, text_color)
+        text_surface = render_text(font, display_text, text_color)
         
         # Центрируем текст в поле ввода
         text_x = input_x + int(20 * scale_w)  # Отступ слева 20 пикселей для текста
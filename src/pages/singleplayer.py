@@ -1,13 +1,15 @@
 import pygame
 import sys
 import os
-import requests
+import time
 from src.pages._base import Page
 from src.widgets._base import Widget
 from src.widgets.button import Button
 from src.utils.image import image_cache_manager
 from src.utils.config import Config
-from src.utils.settings_manager import settings_manager
+from src.utils.settings_manager import settings_manager, SETTINGS_FILE
+from src.utils.font_cache import get_font, render_text
+from src.utils.score_queue import ScoreQueue, new_session_id
 
 # Use path_helper for correct paths in both dev and exe
 from src.utils.path_helper import get_base_dir, get_resource_path
@@ -16,6 +18,11 @@ BASE_DIR = get_base_dir()
 ASSETS_DIR = os.path.join(BASE_DIR, "Assets")
 FONT_PATH = os.path.join(ASSETS_DIR, "fonts", "Jersey_10", "Jersey10-Regular.ttf")
 PACMAN1_DIR = os.path.join(BASE_DIR, "pac-man-1")
+# Записи партий (Replay.py) лежат рядом с настройками, хранятся последние MAX_REPLAYS
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(SETTINGS_FILE)), "replays")
+MAX_REPLAYS = 20
+# Проверенные карты сохраняются между запусками (наполнить заранее: python pac-man-1/MapCache.py)
+MAP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(SETTINGS_FILE)), "map_cache")
 
 # Импортируем игру из pac-man-1
 # Временно меняем рабочую директорию для правильных путей к ресурсам
@@ -23,8 +30,21 @@ old_cwd = os.getcwd()
 sys.path.insert(0, PACMAN1_DIR)
 os.chdir(PACMAN1_DIR)
 from GameScene import GameScene
+from TileRenderer import precompute_theme_tiles
+from Replay import prune_replays
+from MapPool import map_pool
+from MapCache import MapCache
+from Simulation import FIELD_WIDTH, FIELD_HEIGHT
 os.chdir(old_cwd)
 
+# Кэш карт читают и пополняют только процессы MapPool: синхронная генерация в тике
+# (если пул не успел) работает без диска. Сама игра берет из кэша лишь первую карту партии
+map_cache = MapCache(MAP_CACHE_DIR)
+map_pool.cache = map_cache
+
+# Перекрашиваем тайлы всех тем в фоне, чтобы смена темы была мгновенной
+precompute_theme_tiles()
+
 # Импортируем music_manager для управления звуками
 from src.utils.music_manager import music_manager
 
@@ -58,8 +78,13 @@ class Singleplayer(Page):
         self.last_difficulty = 1
         self.score_sent_for_game_over = False  # Чтобы не отправлять несколько раз
         
-        # API URL
-        self.api_url = "http://localhost:3000"
+        # Очередь отправки счета: не блокирует игру и переживает отсутствие сети
+        # (адрес API задается в src/utils/api_client.py)
+        self.score_queue = ScoreQueue()
+        # Досылаем то, что не успело уйти в прошлых запусках
+        self.score_queue.start()
+        # Идентификатор текущей партии (для дедупликации отправок)
+        self.session_id = new_session_id()
         # Позиции центрированы по вертикали (высота экрана 1080, размещаем от 300 до 800)
         self.label_positions = {
             "score": (1213, 300),
@@ -89,15 +114,15 @@ class Singleplayer(Page):
         game_bg_rect = self.game_bg.rect
         
         # Масштабируем surface игры под размер game_bg
-        # GameScene использует screen_map размером 735x813 (увеличенный)
+        # GameScene использует screen_map размером FIELD_WIDTH x FIELD_HEIGHT (735x813, увеличенный)
         if game_bg_rect:
             # Используем стандартные размеры GameScene если игра еще не инициализирована
             if self.game_scene and hasattr(self.game_scene, 'screen_map'):
-                game_original_w = self.game_scene.screen_map.get_width()  # 735
-                game_original_h = self.game_scene.screen_map.get_height()  # 813
+                game_original_w = self.game_scene.screen_map.get_width()
+                game_original_h = self.game_scene.screen_map.get_height()
             else:
-                game_original_w = 735  # Стандартный размер screen_map (увеличенный)
-                game_original_h = 813
+                game_original_w = FIELD_WIDTH  # Стандартный размер screen_map (увеличенный)
+                game_original_h = FIELD_HEIGHT
             
             game_scale_w = game_bg_rect.width / game_original_w
             game_scale_h = game_bg_rect.height / game_original_h
@@ -124,13 +149,7 @@ class Singleplayer(Page):
         text_scale = min(scale_w, scale_h)
 
         font_size = max(16, int(self.font_size_base * text_scale))
-        try:
-            if self.font_path:
-                font = pygame.font.Font(self.font_path, font_size)
-            else:
-                font = pygame.font.Font(None, font_size)
-        except Exception:
-            font = pygame.font.SysFont('arial', font_size)
+        font = get_font(self.font_path, font_size)
 
         # Значения из игры
         if self.game_scene:
@@ -178,51 +197,35 @@ class Singleplayer(Page):
             # Для dev_options и collect_points не добавляем двоеточие и значение
             if key in ["dev_options", "collect_points"]:
                 label_text = self.label_texts[key]
-                label_surface = font.render(label_text, True, color)
+                label_surface = render_text(font, label_text, color)
                 surface.blit(label_surface, (draw_x, draw_y))
             else:
                 label_text = f"{self.label_texts[key]}:"
-                label_surface = font.render(label_text, True, color)
+                label_surface = render_text(font, label_text, color)
                 surface.blit(label_surface, (draw_x, draw_y))
 
-                value_surface = font.render(values[key], True, color)
+                value_surface = render_text(font, values[key], color)
                 value_x = draw_x + 200
                 value_y = draw_y + (label_surface.get_height() - value_surface.get_height()) // 2
                 surface.blit(value_surface, (value_x, value_y))
     
     def save_score_to_leaderboard(self, username, score):
-        """Save score to leaderboard via PATCH /leaderboard/save"""
+        """Queue score for PATCH /leaderboard/save (sent in the background, kept on disk until delivered)"""
+        return self.score_queue.submit(username, score, self.session_id)
+
+    def _save_replay(self):
+        """Сохраняет запись текущей партии в REPLAY_DIR (смотреть: python pac-man-1/Replay.py <файл>)"""
+        if not self.game_scene:
+            return
+        seed = self.game_scene.simulation.seed
+        path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{seed}.pmr")
         try:
-            url = f"{self.api_url}/leaderboard/save"
-            payload = {
-                "username": username,
-                "score": score
-            }
-            print(f"[Singleplayer] PATCH {url}")
-            print(f"[Singleplayer] Request body: {payload}")
-            
-            response = requests.patch(url, json=payload, timeout=5)
-            
-            print(f"[Singleplayer] Response status: {response.status_code}")
-            # 200 and 201 are successful statuses
-            if response.status_code in [200, 201]:
-                data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                print(f"[Singleplayer] Success response: {data}")
-                return True
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                error_msg = error_data.get('message', f'Error {response.status_code}')
-                print(f"[Singleplayer] Error {response.status_code}: {error_msg}")
-                return False
-        except requests.exceptions.RequestException as e:
-            print(f"[Singleplayer] Request exception: {str(e)}")
-            return False
-        except Exception as e:
-            print(f"[Singleplayer] Exception: {str(e)}")
-            return False
+            if self.game_scene.save_recording(path):
+                prune_replays(REPLAY_DIR, MAX_REPLAYS)
+        except OSError as e:
+            print(f"[Singleplayer] Could not save replay: {e}")
 
     def run(self, surface):
-        clock = pygame.time.Clock()
         self.on_resize(surface.get_size())
         
         # Инициализация игры при первом запуске
@@ -239,7 +242,15 @@ class Singleplayer(Page):
             # Временно меняем рабочую директорию для инициализации GameScene
             old_cwd = os.getcwd()
             os.chdir(PACMAN1_DIR)
-            self.game_scene = GameScene()
+            # Карты следующих уровней строятся в фоновом процессе, без рывка между уровнями
+            # Если в кэше много карт, берем seed с готовой первой картой - старт без генерации.
+            # Карту читаем здесь, до начала партии, и отдаем пулу, откуда ее заберет setup()
+            seed = map_cache.pick_seed()
+            if seed is not None:
+                maze = map_cache.get(seed)
+                if maze is not None:
+                    map_pool.add_ready(seed, maze.to_rows())
+            self.game_scene = GameScene(seed=seed, map_pool=map_pool)
             username = settings_manager.get_setting("username", "Player")
             self.game_scene.username = username
             # Устанавливаем тему из Config
@@ -247,39 +258,40 @@ class Singleplayer(Page):
             # Устанавливаем music_manager для проверки мута звуков
             self.game_scene.music_manager = music_manager
             self.game_scene.setup("generated")  # Запускаем сгенерированную карту
+            # Записываем ввод партии, чтобы ее можно было воспроизвести (Replay.py)
+            self.game_scene.start_recording("generated")
             
             # Инициализируем отслеживание после setup
             self.last_game_over_state = False
             self.last_difficulty = getattr(self.game_scene, 'difficulty', 1)
             self.score_sent_for_game_over = False
-            
-            # Устанавливаем громкость звуков через music_manager
-            # Обновляем громкость всех звуков в GameScene
-            if hasattr(self.game_scene, 'start_sound'):
-                self.game_scene.start_sound.set_volume(music_manager.get_sound_volume())
+            self.session_id = new_session_id()
+            # Громкость и мут звуков применяются централизованно в music_manager.sound_bank
             os.chdir(old_cwd)
             
             # GameScene создает свой screen размером 1280x720, но нам нужен только игровой экран
             # Используем screen_map из GameScene (644x713) или весь screen
             self.game_start_time = pygame.time.get_ticks()
             # Инициализируем шрифт для отображения текста
-            try:
-                initial_size = self.font_size_base
-                if self.font_path:
-                    self.font = pygame.font.Font(self.font_path, initial_size)
-                else:
-                    self.font = pygame.font.Font(None, initial_size)
-            except Exception:
-                self.font = pygame.font.SysFont('arial', self.font_size_base)
+            self.font = get_font(self.font_path, self.font_size_base)
             self.game_initialized = True
         
         # Обновляем размер и позицию игры
         window_size = surface.get_size()
         self._update_game_position(window_size)
 
+        # Ограничение частоты кадров: 0 - без ограничения (для мониторов 120/144 Гц).
+        # Скорость игры от него не зависит - симуляция идет фиксированными тиками GameClock
+        max_fps = settings_manager.get_setting("max_fps", 60)
+        # Часы создаются после setup, чтобы время генерации карты не попало в первый кадр
+        clock = pygame.time.Clock()
+
         while True:
+            dt_ms = clock.tick(max_fps)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self._save_replay()
+                    map_pool.shutdown()
                     pygame.quit()
                     sys.exit()
                 elif event.type == pygame.VIDEORESIZE:
@@ -296,9 +308,8 @@ class Singleplayer(Page):
             
             # Обновляем игру из pac-man-1
             if self.game_scene:
-                # Обновляем тему, если она изменилась
-                if self.game_scene.theme_index != Config.CURRENT_THEME:
-                    self.game_scene.theme_index = Config.CURRENT_THEME
+                # Обновляем тему, если она изменилась (сбрасывает кэш слоя лабиринта)
+                self.game_scene.set_theme(Config.CURRENT_THEME)
                 
                 # Отслеживаем изменения difficulty перед обновлением
                 current_difficulty = getattr(self.game_scene, 'difficulty', 1)
@@ -308,7 +319,7 @@ class Singleplayer(Page):
                 old_cwd = os.getcwd()
                 os.chdir(PACMAN1_DIR)
                 user_input = pygame.key.get_pressed()
-                self.game_scene.update(user_input)
+                self.game_scene.advance(user_input, dt_ms)
                 os.chdir(old_cwd)
                 # Используем screen_map из GameScene для отрисовки игрового поля
                 self.game_surface = self.game_scene.screen_map
@@ -337,6 +348,7 @@ class Singleplayer(Page):
                 # Сбрасываем флаг отправки при новом старте игры
                 if not current_game_over and self.score_sent_for_game_over:
                     self.score_sent_for_game_over = False
+                    self.session_id = new_session_id()
             
             # Проверяем состояние игры (game over)
             # Автоматическое перенаправление закомментировано
@@ -380,15 +392,9 @@ class Singleplayer(Page):
                 text_scale = min(scale_w, scale_h)
 
                 font_size = max(32, int(self.font_size_base * text_scale))
-                try:
-                    if self.font_path:
-                        go_font = pygame.font.Font(self.font_path, font_size)
-                    else:
-                        go_font = pygame.font.Font(None, font_size)
-                except Exception:
-                    go_font = pygame.font.SysFont('arial', font_size)
+                go_font = get_font(self.font_path, font_size)
 
-                game_over_text = go_font.render("GAME OVER", True, (255, 0, 0))
+                game_over_text = render_text(go_font, "GAME OVER", (255, 0, 0))
 
                 if self.game_rect:
                     # По центру окна игры по горизонтали и вертикали
@@ -420,6 +426,9 @@ class Singleplayer(Page):
                     mixer.music.set_volume(0.0)
                 mixer.music.play(loops=-1)
                 
+                self._save_replay()
+                # Карты для брошенной партии больше не нужны - не держим процессы пула
+                map_pool.shutdown()
                 # Сбрасываем игру при выходе из страницы
                 self.game_initialized = False
                 self.game_scene = None
@@ -435,5 +444,4 @@ class Singleplayer(Page):
             if self.sound_icon.draw(surface):
                 music_manager.toggle_all_sounds()
 
-            pygame.display.flip()
-            clock.tick(60)
\ No newline at end of file
+            pygame.display.flip()
\ No newline at end of file
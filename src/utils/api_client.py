@@ -0,0 +1,167 @@
+"""
+Shared HTTP client for the leaderboard API
+"""
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "http://localhost:3000"
+
+LATENCY_SAMPLES = 200  # Recent samples kept per endpoint for percentiles
+
+
+class ApiResponse:
+    """Result of an API call; on 304 `data` holds the body cached from the last 200"""
+
+    def __init__(self, status_code, data, headers, elapsed_ms, not_modified=False):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers
+        self.elapsed_ms = elapsed_ms
+        self.not_modified = not_modified
+
+    @property
+    def ok(self):
+        return self.status_code in (200, 201, 304)
+
+    def message(self, default):
+        """Server error message if the body has one"""
+        if isinstance(self.data, dict):
+            return self.data.get('message', default)
+        return default
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.total_ms = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, elapsed_ms, status_code):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.samples.append(elapsed_ms)
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        elif status_code == 304:
+            self.not_modified += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            if not ordered:
+                return None
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'not_modified': self.not_modified,
+            'avg_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'max_ms': ordered[-1] if ordered else None,
+        }
+
+
+class ApiClient:
+    """
+    One requests.Session for every page and background worker:
+    - keep-alive connection pool, so repeated calls reuse the TCP connection
+    - conditional GET: ETag / Last-Modified of the last 200 are sent back as
+      If-None-Match / If-Modified-Since, and a 304 returns the cached body
+    - gzip/deflate response compression
+    - latency metrics per endpoint name
+    """
+
+    def __init__(self, base_url=API_URL, timeout=5, pool_size=4):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        self._lock = threading.Lock()
+        # url -> (etag, last_modified, parsed body)
+        self._validators = {}
+        self._stats = {}
+
+    def get(self, path, endpoint=None, conditional=True):
+        return self.request("GET", path, endpoint, conditional=conditional)
+
+    def patch(self, path, json=None, endpoint=None):
+        return self.request("PATCH", path, endpoint, json=json)
+
+    def request(self, method, path, endpoint=None, json=None, conditional=False):
+        """
+        Send a request and parse the JSON body.
+        Network errors are raised as requests.exceptions.RequestException
+        """
+        url = f"{self.base_url}{path}"
+        endpoint = endpoint or f"{method} {path}"
+        headers = {}
+        cached = None
+        if conditional:
+            with self._lock:
+                cached = self._validators.get(url)
+            if cached is not None:
+                etag, last_modified, _ = cached
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, json=json, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self._record(endpoint, (time.perf_counter() - start) * 1000, None)
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record(endpoint, elapsed_ms, response.status_code)
+
+        if response.status_code == 304 and cached is not None:
+            return ApiResponse(304, cached[2], response.headers, elapsed_ms, not_modified=True)
+
+        data = None
+        if response.headers.get('content-type', '').startswith('application/json'):
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+
+        if conditional and response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            with self._lock:
+                if etag or last_modified:
+                    self._validators[url] = (etag, last_modified, data)
+                else:
+                    self._validators.pop(url, None)
+
+        return ApiResponse(response.status_code, data, response.headers, elapsed_ms)
+
+    def _record(self, endpoint, elapsed_ms, status_code):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.add(elapsed_ms, status_code)
+
+    def get_metrics(self):
+        """Latency summary per endpoint: count, errors, 304s, avg/p50/p95/max in ms"""
+        with self._lock:
+            return {endpoint: stats.summary() for endpoint, stats in self._stats.items()}
+
+
+# Shared client for all pages
+api_client = ApiClient()
@@ -0,0 +1,94 @@
+"""
+Общий кэш шрифтов и отрисованного текста для страниц и GameScene
+"""
+import pygame
+from collections import OrderedDict
+
+# Шрифты по ключу (path, size)
+_font_registry = {}
+# (path, size), которые не загрузились -> запасной шрифт; файл повторно не открываем до clear_fonts()
+_failed_fonts = {}
+
+
+def get_font(path, size):
+    """Возвращает pygame.font.Font для (path, size), создавая его только один раз"""
+    size = max(1, int(size))
+    key = (path, size)
+    font = _font_registry.get(key) or _failed_fonts.get(key)
+    if font is None:
+        try:
+            font = pygame.font.Font(path, size)
+        except Exception:
+            # Запасной шрифт запоминается отдельно: _font_registry хранит только настоящие шрифты
+            font = _failed_fonts[key] = get_sys_font('arial', size)
+            return font
+        _font_registry[key] = font
+    return font
+
+
+def get_sys_font(name, size):
+    """Системный шрифт (pygame.font.SysFont) из того же кэша"""
+    size = max(1, int(size))
+    key = ("sysfont", name, size)
+    font = _font_registry.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _font_registry[key] = font
+    return font
+
+
+class TextCache:
+    """LRU-кэш отрисованных надписей по ключу (шрифт, текст, цвет)"""
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Аналог font.render с кэшированием.
+        Возвращаемая поверхность общая - ее можно только блитить, но не изменять
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._surfaces),
+            "fonts": len(_font_registry),
+            "failed_fonts": len(_failed_fonts),
+        }
+
+
+# Глобальный кэш надписей
+text_cache = TextCache()
+
+
+def clear_fonts():
+    """Сбрасывает шрифты (и надписи, нарисованные ими): следующий get_font снова откроет файлы"""
+    _font_registry.clear()
+    _failed_fonts.clear()
+    text_cache.clear()
+
+
+def render_text(font, text, color, antialias=True):
+    """Рисует текст через глобальный кэш надписей"""
+    return text_cache.render(font, text, color, antialias)
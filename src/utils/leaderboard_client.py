@@ -0,0 +1,342 @@
+import threading
+import time
+import requests
+from src.utils.api_client import api_client
+from src.utils.response_cache import response_cache
+from src.utils.sorted_leaderboard import SortedLeaderboard
+
+# Cached responses younger than this are not refetched unless forced
+LEADERBOARD_TTL = 5.0
+PLAYER_TTL = 5.0
+# The full board is written to the response cache at most this often (and by save_cache()),
+# not after every delta
+CACHE_SAVE_INTERVAL = 60.0
+# Replies to GET /leaderboard?since= that mean the server has no delta support
+DELTA_UNSUPPORTED_STATUSES = (400, 404, 501)
+
+
+class LeaderboardSnapshot:
+    """Immutable view of the last fetch results, safe to read from the UI thread"""
+
+    def __init__(self, player=None, error_message=None, loading=False, has_data=False,
+                 updated_at=None, version=0, changes=(), removed=(), reloaded=False):
+        # {'rank': ..., 'score': ...} or None if player data was never loaded
+        self.player = player
+        self.error_message = error_message
+        self.loading = loading
+        self.has_data = has_data
+        self.updated_at = updated_at
+        self.version = version
+        # What happened to LeaderboardClient.board since the previous snapshot:
+        # changed rows as (username, score) pairs, removed usernames, or the whole board reloaded
+        self.changes = changes
+        self.removed = removed
+        self.reloaded = reloaded
+
+    def replace(self, **changes):
+        values = dict(self.__dict__)
+        values.update(changes=(), removed=(), reloaded=False)
+        values.update(changes)
+        values['version'] = self.version + 1
+        return LeaderboardSnapshot(**values)
+
+
+class LeaderboardClient:
+    """
+    Fetches leaderboard and player data on a background worker thread.
+
+    The rows live in one SortedLeaderboard (self.board) that only the worker
+    updates, in O(log n) per changed player; the page draws its rows and the
+    player's rank straight from it. Snapshots carry just what changed.
+
+    The UI thread only calls refresh() and snapshot(), neither of which blocks.
+    A refresh requested while another one is running is coalesced: the worker
+    runs exactly one more fetch afterwards with the latest requested username.
+
+    The board (with its version) is stored in the response cache every
+    CACHE_SAVE_INTERVAL seconds and when the page closes (save_cache()), so the
+    next launch starts from the cached board and only revalidates it in the
+    background (stale-while-revalidate), with a delta when the version is still known.
+
+    Once a full leaderboard with a version is known, polling asks only for
+    changes: GET /leaderboard?since=<version> answered with
+    {"version": V, "changes": [{username, score}, ...], "removed": [username, ...]}.
+    A full list in reply (server has no deltas or the version is too old) is
+    loaded as is; an error reply switches the client back to full fetches.
+    """
+
+    def __init__(self, api=api_client, cache=response_cache):
+        self.api = api
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._snapshot = LeaderboardSnapshot()
+        # Written only by the worker thread, read by the page (the board has its own lock)
+        self.board = SortedLeaderboard()
+        self.delta_supported = True
+        self._last_version = None
+        self._last_not_modified = False
+        self._pending = False
+        self._pending_force = False
+        self._pending_username = None
+        self._pending_cache = False
+        # When the board was last confirmed by the server and last written to the cache
+        self._board_checked_at = None
+        self._board_saved_at = 0.0
+        self._board_dirty = False
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="leaderboard-client", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+
+    def load_cached(self, username=None):
+        """
+        Publish cached player data right away and have the worker load the cached
+        leaderboard into the board before it goes to the network (no network)
+        """
+        player = self.cache.get(f"player:{username}") if username else None
+        with self._lock:
+            if player is not None and self._snapshot.player is None:
+                self._snapshot = self._snapshot.replace(player=player.data)
+            if not self._snapshot.has_data:
+                self._pending_cache = True
+        self.start()
+        self._wakeup.set()
+
+    def _load_cached_board(self):
+        """Worker: fill the empty board from the response cache"""
+        leaderboard = self.cache.get("leaderboard")
+        if leaderboard is None or len(self.board):
+            return
+        data = leaderboard.data
+        if isinstance(data, dict):
+            self.board.replace_all(data.get('leaderboard') or [], data.get('version'))
+        else:
+            self.board.replace_all(data)
+        with self._lock:
+            if not self._snapshot.has_data:
+                self._snapshot = self._snapshot.replace(
+                    reloaded=True, has_data=True, updated_at=leaderboard.stored_at)
+
+    def refresh(self, username=None, force=False):
+        """
+        Request a refresh; returns immediately.
+        Without force, responses still fresh in the cache are not refetched
+        """
+        with self._lock:
+            self._pending = True
+            self._pending_force = self._pending_force or force
+            self._pending_username = username
+            if not self._snapshot.loading:
+                self._snapshot = self._snapshot.replace(loading=True)
+        self.start()
+        self._wakeup.set()
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    def is_busy(self):
+        with self._lock:
+            return self._pending or self._snapshot.loading
+
+    def _worker(self):
+        while self._running:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while self._running:
+                with self._lock:
+                    load_cache = self._pending_cache
+                    self._pending_cache = False
+                if load_cache:
+                    self._load_cached_board()
+                with self._lock:
+                    if not self._pending:
+                        break
+                    self._pending = False
+                    force = self._pending_force
+                    self._pending_force = False
+                    username = self._pending_username
+                self._refresh_now(username, force)
+
+    def _refresh_now(self, username, force=False):
+        update, error_message = None, None
+        if force or not self._leaderboard_fresh():
+            update, error_message = self.update_leaderboard()
+            if error_message is None:
+                self._board_checked_at = time.time()
+            with self._lock:
+                self._board_dirty = self._board_dirty or update is not None
+                save_due = time.time() - self._board_saved_at >= CACHE_SAVE_INTERVAL
+            if save_due:
+                self.save_cache()
+        player = None
+        if username and (force or not self.cache.is_fresh(f"player:{username}", PLAYER_TTL)):
+            player = self.fetch_player_data(username)
+            if player is not None:
+                self.cache.put(f"player:{username}", player)
+
+        with self._lock:
+            current = self._snapshot
+            changes = {
+                'error_message': error_message,
+                # Stay in loading state if another refresh was requested meanwhile
+                'loading': self._pending,
+                'updated_at': time.time(),
+            }
+            if update is not None:
+                changes.update(update)
+                changes['has_data'] = True
+            if player is not None:
+                changes['player'] = player
+            self._snapshot = current.replace(**changes)
+
+    def _leaderboard_fresh(self):
+        if self._board_checked_at is not None:
+            return time.time() - self._board_checked_at < LEADERBOARD_TTL
+        return self.cache.is_fresh("leaderboard", LEADERBOARD_TTL)
+
+    def save_cache(self):
+        """Write the board to the response cache if it changed since the last save (O(n), not per delta)"""
+        # Called from the worker (timer) and from the UI thread (page close)
+        with self._lock:
+            if not self._board_dirty:
+                return
+            self._board_dirty = False
+            self._board_saved_at = time.time()
+        self.cache.put("leaderboard", {'version': self.board.version, 'leaderboard': self.board.entries()})
+
+    def update_leaderboard(self):
+        """
+        Bring the local board up to date with a delta or a full fetch.
+        Returns (snapshot fields describing the update or None if unchanged/failed, error message)
+        """
+        if self.delta_supported and self.board.version is not None:
+            delta, error_message = self.fetch_leaderboard_changes(self.board.version)
+            if delta is not None:
+                if 'changes' in delta:
+                    changes, removed = self.board.apply(delta.get('changes') or [], delta.get('removed') or [],
+                                                        delta.get('version'))
+                    if not changes and not removed:
+                        return None, None
+                    return {'changes': tuple(changes), 'removed': tuple(removed)}, None
+                self.board.replace_all(delta['leaderboard'], delta.get('version'))
+                return {'reloaded': True}, None
+            if error_message is not None:
+                return None, error_message
+
+        data, error_message = self.fetch_leaderboard()
+        if data is None:
+            return None, error_message
+        if self._last_not_modified and len(self.board):
+            return None, None
+        self.board.replace_all(data, self._last_version)
+        return {'reloaded': True}, None
+
+    def fetch_leaderboard_changes(self, since):
+        """
+        Ask for changes since a version.
+        Returns (delta dict or None, error message or None); (None, None) means
+        deltas are not supported and a full fetch should be done instead
+        """
+        try:
+            response = self.api.get(f"/leaderboard?since={since}", endpoint="leaderboard.delta",
+                                    conditional=False)
+        except requests.exceptions.RequestException as e:
+            print(f"[Leaderboard] Request exception: {str(e)}")
+            return None, f"Connection error: {str(e)}"
+
+        data = response.data
+        if response.status_code == 200:
+            if isinstance(data, dict) and 'changes' in data:
+                return data, None
+            if isinstance(data, dict) and isinstance(data.get('leaderboard'), list):
+                return data, None
+            if isinstance(data, list):
+                return {'leaderboard': data, 'version': None}, None
+        elif response.status_code not in DELTA_UNSUPPORTED_STATUSES:
+            # 5xx, 429 and the like are temporary: report the error and ask for a delta again next poll
+            error_msg = response.message(f'Error {response.status_code}')
+            print(f"[Leaderboard] Delta error {response.status_code}: {error_msg}")
+            return None, error_msg
+        # The server does not understand deltas
+        print(f"[Leaderboard] Delta updates not supported ({response.status_code}), using full fetches")
+        self.delta_supported = False
+        return None, None
+
+    def fetch_leaderboard(self):
+        """Fetch leaderboard data from API. Returns (entries or None, error message or None)"""
+        try:
+            print(f"[Leaderboard] Fetching from {self.api.base_url}/leaderboard")
+            response = self.api.get("/leaderboard", endpoint="leaderboard")
+
+            if response.status_code in (200, 304):
+                data = response.data
+                if not response.not_modified:
+                    print(f"[Leaderboard] Received data: {data}")
+
+                # Expected format: list of {username, score} or {rank, username, score}
+                self._last_version = None
+                self._last_not_modified = response.not_modified
+                if isinstance(data, list):
+                    return data, None
+                elif isinstance(data, dict) and 'leaderboard' in data:
+                    self._last_version = data.get('version')
+                    return data['leaderboard'], None
+                print(f"[Leaderboard] Unexpected data format: {data}")
+                return [], None
+            else:
+                error_msg = response.message(f'Error {response.status_code}')
+                print(f"[Leaderboard] Error {response.status_code}: {error_msg}")
+                return None, error_msg
+        except requests.exceptions.RequestException as e:
+            print(f"[Leaderboard] Request exception: {str(e)}")
+            return None, f"Connection error: {str(e)}"
+        except Exception as e:
+            print(f"[Leaderboard] Exception: {str(e)}")
+            return None, f"Error: {str(e)}"
+
+    def fetch_player_data(self, username):
+        """
+        Fetch current player's rank and score from API.
+        Returns {'rank': ..., 'score': ...} (both None if the player is not ranked)
+        or None if the request failed and the previous value should be kept
+        """
+        try:
+            print(f"[Leaderboard] Fetching player data from {self.api.base_url}/leaderboard/player/{username}")
+            response = self.api.get(f"/leaderboard/player/{username}", endpoint="leaderboard.player")
+
+            if response.status_code in (200, 304):
+                data = response.data
+                if not response.not_modified:
+                    print(f"[Leaderboard] Player data received: {data}")
+
+                # Expected format: {rank, username, score} or similar
+                if isinstance(data, dict):
+                    return {'rank': data.get('rank', None), 'score': data.get('score', None)}
+                print(f"[Leaderboard] Unexpected player data format: {data}")
+                return {'rank': None, 'score': None}
+            elif response.status_code == 404:
+                # Player not found - show "-"
+                error_msg = response.message('Player not found')
+                print(f"[Leaderboard] Player not found (404): {error_msg}")
+                return {'rank': None, 'score': None}
+            else:
+                error_msg = response.message(f'Error {response.status_code}')
+                print(f"[Leaderboard] Error {response.status_code} fetching player data: {error_msg}")
+                return None
+        except requests.exceptions.RequestException as e:
+            print(f"[Leaderboard] Request exception fetching player data: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"[Leaderboard] Exception fetching player data: {str(e)}")
+            return None
@@ -0,0 +1,188 @@
+"""
+Order-statistic index over leaderboard scores
+"""
+import random
+
+MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        # width[i] - how many bottom-level steps next[i] skips
+        self.width = [1] * level
+
+
+class LeaderboardIndex:
+    """
+    Indexable skip list ordered by (-score, username): the best score comes
+    first, ties are broken by username. Each link stores how many entries it
+    skips, so both "what is the rank of X" and "who is at rank k" are
+    O(log n) expected, without sorting or scanning the leaderboard.
+
+        index.update("bob", 500)
+        index.rank_of("bob")       -> 1
+        index.top_k(10)            -> [("bob", 500), ...]
+        index.around("bob", 2)     -> [(rank, username, score), ...]
+    """
+
+    def __init__(self, entries=(), seed=None):
+        self._rng = random.Random(seed)
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._scores = {}
+        self._bulk_load(entries)
+
+    def _bulk_load(self, entries):
+        """Build from scratch in O(n log n) sort + O(n) linking instead of n inserts"""
+        for username, score in entries:
+            # Several rows for one player: keep the best one
+            if score > self._scores.get(username, score - 1):
+                self._scores[username] = score
+        if not self._scores:
+            return
+        keys = sorted((-score, username) for username, score in self._scores.items())
+        last = [self._head] * MAX_LEVEL
+        last_position = [-1] * MAX_LEVEL
+        for position, key in enumerate(keys):
+            level = self._random_level()
+            self._level = max(self._level, level)
+            node = _Node(key, level)
+            for i in range(level):
+                last[i].next[i] = node
+                last[i].width[i] = position - last_position[i]
+                last[i] = node
+                last_position[i] = position
+        # Links to the end of the list
+        for i in range(self._level):
+            last[i].width[i] = len(keys) - last_position[i]
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, username):
+        return username in self._scores
+
+    def score_of(self, username):
+        return self._scores.get(username)
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_path(self, key):
+        """Last node before key on every level and its 0-based position"""
+        update = [self._head] * MAX_LEVEL
+        positions = [-1] * MAX_LEVEL
+        node = self._head
+        position = -1
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = position
+        return update, positions
+
+    def insert(self, username, score):
+        """Add a new player; use update() if the player may already be present"""
+        if username in self._scores:
+            raise KeyError(f"{username} is already in the index")
+        key = (-score, username)
+        update, positions = self._find_path(key)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                positions[i] = -1
+                self._head.width[i] = len(self._scores) + 1
+            self._level = level
+
+        node = _Node(key, level)
+        position = positions[0] + 1  # 0-based position of the new node
+        for i in range(level):
+            prev = update[i]
+            node.next[i] = prev.next[i]
+            prev.next[i] = node
+            skipped = position - positions[i]
+            node.width[i] = prev.width[i] - skipped + 1
+            prev.width[i] = skipped
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._scores[username] = score
+
+    def remove(self, username):
+        """Remove a player; returns False if the player was not in the index"""
+        score = self._scores.pop(username, None)
+        if score is None:
+            return False
+        key = (-score, username)
+        update, _ = self._find_path(key)
+        node = update[0].next[0]
+        for i in range(self._level):
+            prev = update[i]
+            if prev.next[i] is node:
+                prev.width[i] += node.width[i] - 1
+                prev.next[i] = node.next[i]
+            else:
+                prev.width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        return True
+
+    def update(self, username, score):
+        """Insert a player or move them to a new score"""
+        old_score = self._scores.get(username)
+        if old_score == score:
+            return
+        if old_score is not None:
+            self.remove(username)
+        self.insert(username, score)
+
+    def rank_of(self, username):
+        """1-based rank or None if the player is not in the index"""
+        score = self._scores.get(username)
+        if score is None:
+            return None
+        _, positions = self._find_path((-score, username))
+        return positions[0] + 2
+
+    def _node_at(self, position):
+        """Node at a 0-based position"""
+        node = self._head
+        steps = position + 1
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.width[level] <= steps:
+                steps -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def entries_from(self, rank, count):
+        """Up to count entries starting at a 1-based rank: [(rank, username, score), ...]"""
+        result = []
+        if rank < 1 or rank > len(self._scores) or count <= 0:
+            return result
+        node = self._node_at(rank - 1)
+        while node is not None and len(result) < count:
+            neg_score, username = node.key
+            result.append((rank, username, -neg_score))
+            rank += 1
+            node = node.next[0]
+        return result
+
+    def top_k(self, k):
+        """Best k players: [(username, score), ...]"""
+        return [(username, score) for _, username, score in self.entries_from(1, k)]
+
+    def around(self, username, k):
+        """The player with up to k neighbours above and below: [(rank, username, score), ...]"""
+        rank = self.rank_of(username)
+        if rank is None:
+            return []
+        start = max(1, rank - k)
+        return self.entries_from(start, rank - start + k + 1)
@@ -4,6 +4,101 @@
 import pygame
 import os
 from .settings_manager import settings_manager
+from .path_helper import get_resource_path
+
+# Папка со звуковыми эффектами игры
+SOUNDS_DIR = os.path.join("pac-man-1", "Static", "Sounds")
+
+# Эффект -> категория. Каждой категории выделяется свой зарезервированный канал микшера
+SOUND_CATEGORIES = {
+    "game_start": "start",
+    "win": "events",
+    "death": "events",
+    "eat_ghost": "ghost",
+    "energizer": "energizer",
+    "eating": "eating",
+}
+
+# Минимальный интервал между повторами одного эффекта (мс); более частые повторы отбрасываются
+SOUND_MIN_INTERVAL_MS = {
+    "eating": 150,
+    "energizer": 100,
+    "eat_ghost": 100,
+}
+
+# Категории, в которых новый звук не перебивает еще играющий, а отбрасывается
+COALESCED_CATEGORIES = {"eating"}
+
+
+class SoundBank:
+    """
+    Банк звуковых эффектов: все .ogg декодируются один раз,
+    каждая категория играет на своем канале, громкость и мут берутся из MusicManager
+    """
+
+    def __init__(self, manager, sounds_dir=SOUNDS_DIR):
+        self.manager = manager
+        self.sounds_dir = sounds_dir
+        self.sounds = {}
+        self.channels = {}
+        self.last_played = {}
+        self.loaded = False
+        self.stats = {"played": 0, "dropped": 0}
+
+    def load(self):
+        """Декодирует все эффекты и резервирует каналы (повторные вызовы ничего не делают)"""
+        if self.loaded:
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        for name in SOUND_CATEGORIES:
+            path = get_resource_path(os.path.join(self.sounds_dir, f"{name}.ogg"))
+            self.sounds[name] = pygame.mixer.Sound(path)
+
+        categories = sorted(set(SOUND_CATEGORIES.values()))
+        if pygame.mixer.get_num_channels() < len(categories) + 4:
+            pygame.mixer.set_num_channels(len(categories) + 4)
+        # Зарезервированные каналы не используются Sound.play() без явного канала
+        pygame.mixer.set_reserved(len(categories))
+        for index, category in enumerate(categories):
+            self.channels[category] = pygame.mixer.Channel(index)
+        self.loaded = True
+
+    def play(self, name):
+        """Проигрывает эффект по имени. Возвращает False если звук отброшен или замьючен"""
+        if self.manager.is_sounds_muted():
+            return False
+        self.load()
+        sound = self.sounds[name]
+        category = SOUND_CATEGORIES[name]
+        channel = self.channels[category]
+
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        min_interval = SOUND_MIN_INTERVAL_MS.get(name, 0)
+        too_often = last is not None and now - last < min_interval
+        still_playing = category in COALESCED_CATEGORIES and channel.get_busy()
+        if too_often or still_playing:
+            self.stats["dropped"] += 1
+            return False
+
+        channel.set_volume(self.manager.get_sound_volume())
+        channel.play(sound)
+        self.last_played[name] = now
+        self.stats["played"] += 1
+        return True
+
+    def apply_volume(self):
+        """Применяет текущую громкость к уже играющим эффектам"""
+        volume = 0.0 if self.manager.is_sounds_muted() else self.manager.get_sound_volume()
+        for channel in self.channels.values():
+            channel.set_volume(volume)
+
+    def stop(self):
+        """Останавливает все эффекты банка"""
+        for channel in self.channels.values():
+            channel.stop()
+
 
 class MusicManager:
     """Класс для управления музыкой и звуками игры"""
@@ -16,6 +111,7 @@ class MusicManager:
         self.music_muted = settings.get("music_muted", False)  # Флаг мута музыки
         self.sounds_muted = settings.get("sounds_muted", False)  # Флаг мута звуков
         self._saved_volume = self.music_volume  # Сохраненная громкость перед мутом
+        self.sound_bank = SoundBank(self)  # Звуковые эффекты игры (загружаются при первом проигрывании)
         
         # Инициализируем mixer если еще не инициализирован
         if not pygame.mixer.get_init():
@@ -38,6 +134,7 @@ class MusicManager:
     def set_sound_volume(self, volume):
         """Устанавливает громкость звуковых эффектов (0.0 - 1.0)"""
         self.sound_volume = max(0.0, min(1.0, volume))
+        self.sound_bank.apply_volume()
         # Сохраняем настройки
         settings_manager.update_settings(sound_volume=self.sound_volume)
     
@@ -62,6 +159,8 @@ class MusicManager:
     def toggle_sounds_mute(self):
         """Переключает мута звуковых эффектов"""
         self.sounds_muted = not self.sounds_muted
+        if self.sounds_muted:
+            self.sound_bank.stop()
         # Сохраняем настройки
         settings_manager.update_settings(sounds_muted=self.sounds_muted)
         return self.sounds_muted
@@ -0,0 +1,89 @@
+"""
+In-memory + on-disk cache of the last API responses
+"""
+import json
+import os
+import threading
+import time
+
+from src.utils.settings_manager import SETTINGS_FILE
+
+# Stored next to settings.json (user directory in exe, project root in dev)
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(SETTINGS_FILE)), "leaderboard_cache.json")
+
+MAX_STALE = 7 * 24 * 3600  # Older entries are not shown at all
+
+
+class CacheEntry:
+    def __init__(self, data, stored_at):
+        self.data = data
+        self.stored_at = stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    """
+    Keeps the last response per key (e.g. "leaderboard", "player:<username>").
+    Entries are served even when stale (stale-while-revalidate); the caller
+    decides with is_fresh() whether a background revalidation is needed.
+    """
+
+    def __init__(self, cache_file=CACHE_FILE, max_stale=MAX_STALE):
+        self.cache_file = cache_file
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._loaded = False
+
+    def _load(self):
+        """Read the cache file once (lock must be held)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            for key, value in raw.items():
+                self._entries[key] = CacheEntry(value["data"], value["stored_at"])
+        except (IOError, ValueError, KeyError, TypeError) as e:
+            print(f"[ResponseCache] Ignoring unreadable cache: {e}")
+            self._entries = {}
+
+    def get(self, key):
+        """Cached entry or None if there is none or it is older than max_stale"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+        if entry is None or entry.age() > self.max_stale:
+            return None
+        return entry
+
+    def is_fresh(self, key, ttl):
+        entry = self.get(key)
+        return entry is not None and entry.age() < ttl
+
+    def put(self, key, data):
+        with self._lock:
+            self._load()
+            self._entries[key] = CacheEntry(data, time.time())
+            raw = {key: {"data": entry.data, "stored_at": entry.stored_at}
+                   for key, entry in self._entries.items()}
+            self._save(raw)
+
+    def _save(self, raw):
+        """Atomically rewrite the cache file (lock must be held)"""
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(raw, f, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except IOError as e:
+            print(f"[ResponseCache] Could not save cache: {e}")
+
+
+# Shared cache for leaderboard responses
+response_cache = ResponseCache()
@@ -0,0 +1,191 @@
+"""
+Persistent outbound queue for leaderboard score submissions
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+import requests
+
+from src.utils.settings_manager import SETTINGS_FILE
+from src.utils.api_client import api_client
+
+# The outbox lives next to settings.json (user directory in exe, project root in dev)
+OUTBOX_FILE = os.path.join(os.path.dirname(os.path.abspath(SETTINGS_FILE)), "score_outbox.jsonl")
+
+BATCH_SIZE = 20  # Max submissions sent in one pass over a keep-alive connection
+BACKOFF_BASE = 1.0  # Seconds before the first retry
+BACKOFF_MAX = 60.0  # Upper bound for the retry delay
+SENT_KEYS_LIMIT = 1000  # How many delivered keys to remember for deduplication
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class ScoreQueue:
+    """
+    Score submissions are appended to a JSONL outbox on disk and delivered to
+    PATCH /leaderboard/save by a background sender, so the game loop never
+    waits for the network and nothing is lost while the server is down.
+
+    - pending entries survive restarts and are resent on the next launch
+    - several pending entries are sent in one pass over the shared keep-alive session
+    - failures are retried with exponential backoff and jitter
+    - a (username, score, session) triple is only ever queued once
+    """
+
+    def __init__(self, api=api_client, outbox_file=OUTBOX_FILE):
+        self.api = api
+        self.outbox_file = outbox_file
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = self._load()
+        self._sent_keys = []
+        self._thread = None
+        self._running = False
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.stats = {"queued": 0, "sent": 0, "duplicates": 0, "rejected": 0, "retries": 0}
+
+    @staticmethod
+    def _key(entry):
+        return (entry["username"], entry["score"], entry["session"])
+
+    def _load(self):
+        """Read entries left over from a previous run (a torn last line is skipped)"""
+        entries = []
+        if not os.path.exists(self.outbox_file):
+            return entries
+        try:
+            with open(self.outbox_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except IOError as e:
+            print(f"[ScoreQueue] Could not read outbox: {e}")
+        return entries
+
+    def _rewrite(self):
+        """Atomically replace the outbox with the current pending entries (lock must be held)"""
+        temp_file = self.outbox_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temp_file, self.outbox_file)
+
+    def submit(self, username, score, session):
+        """Queue a submission; returns False if the same one is already queued or sent"""
+        entry = {
+            "username": username,
+            "score": int(score),
+            "session": session,
+            "created": time.time(),
+        }
+        key = self._key(entry)
+        with self._lock:
+            if key in self._sent_keys or any(self._key(e) == key for e in self._pending):
+                self.stats["duplicates"] += 1
+                return False
+            self._pending.append(entry)
+            self.stats["queued"] += 1
+            try:
+                os.makedirs(os.path.dirname(self.outbox_file), exist_ok=True)
+                with open(self.outbox_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except IOError as e:
+                # Still kept in memory and sent during this run
+                print(f"[ScoreQueue] Could not write outbox: {e}")
+        self.start()
+        self._wakeup.set()
+        return True
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="score-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+
+    def _worker(self):
+        while self._running:
+            delay = self.next_attempt - time.time()
+            if delay > 0:
+                # Waiting out the backoff; a new submission does not skip it
+                time.sleep(min(delay, 1.0))
+                continue
+            with self._lock:
+                batch = list(self._pending[:BATCH_SIZE])
+            if not batch:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        done = []
+        failed = False
+        for entry in batch:
+            result = self._send_one(entry)
+            if result is None:
+                failed = True
+                break
+            done.append(entry)
+            if result:
+                self.stats["sent"] += 1
+            else:
+                self.stats["rejected"] += 1
+
+        with self._lock:
+            if done:
+                done_ids = set(map(id, done))
+                self._pending = [e for e in self._pending if id(e) not in done_ids]
+                self._sent_keys.extend(self._key(e) for e in done)
+                del self._sent_keys[:-SENT_KEYS_LIMIT]
+                try:
+                    self._rewrite()
+                except IOError as e:
+                    print(f"[ScoreQueue] Could not rewrite outbox: {e}")
+
+        if failed:
+            self.failures += 1
+            self.stats["retries"] += 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+            self.next_attempt = time.time() + delay * random.uniform(0.5, 1.0)
+        else:
+            self.failures = 0
+            self.next_attempt = 0.0
+
+    def _send_one(self, entry):
+        """
+        Returns True when the server accepted the score, False when it rejected it
+        for good (4xx, dropped from the queue) and None when it should be retried
+        """
+        payload = {"username": entry["username"], "score": entry["score"]}
+        try:
+            print(f"[ScoreQueue] PATCH {self.api.base_url}/leaderboard/save {payload}")
+            response = self.api.patch("/leaderboard/save", json=payload, endpoint="leaderboard.save")
+        except requests.exceptions.RequestException as e:
+            print(f"[ScoreQueue] Request exception: {str(e)}")
+            return None
+
+        if response.status_code in [200, 201]:
+            return True
+        if response.status_code == 429 or response.status_code >= 500:
+            print(f"[ScoreQueue] Server error {response.status_code}, will retry")
+            return None
+        error_msg = response.message(f'Error {response.status_code}')
+        print(f"[ScoreQueue] Rejected {response.status_code}: {error_msg}")
+        return False
@@ -28,7 +28,8 @@ class SettingsManager:
             "sound_volume": 1.0,
             "music_muted": False,
             "sounds_muted": False,
-            "theme": 1
+            "theme": 1,
+            "max_fps": 60  # 0 - без ограничения частоты кадров
         }
     
     def load_settings(self):
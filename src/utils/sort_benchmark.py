@@ -0,0 +1,235 @@
+"""
+Benchmark for the leaderboard sorting algorithms.
+
+Runs every sort on synthetic leaderboards of several sizes and score
+distributions, repeats each measurement, and reports median/p95 time and
+peak memory. The Leaderboard page runs it in a separate process
+(start_benchmark_process), so the sorts and tracemalloc never slow the UI.
+Headless:
+
+    python -m src.utils.sort_benchmark --sizes 100,1000,10000 --trials 5 --csv sorts.csv
+"""
+import argparse
+import csv
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.sorting import SORTS, available_sorts
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+DEFAULT_TRIALS = 5
+
+# Larger inputs are skipped for an algorithm unless limits are disabled
+# (insertion sort is O(n^2): 10k entries already take seconds, 1M would take days)
+SIZE_LIMITS = {
+    'insertion': 5000,
+}
+
+MAX_SCORE = 1000000
+
+CSV_FIELDS = ('algorithm', 'distribution', 'size', 'trials',
+              'median_ms', 'p95_ms', 'min_ms', 'max_ms', 'peak_memory_kb', 'correct')
+
+
+def _uniform(rng, n):
+    return [rng.randrange(MAX_SCORE) for _ in range(n)]
+
+
+def _normal(rng, n):
+    return [min(MAX_SCORE - 1, max(0, int(rng.gauss(MAX_SCORE / 2, MAX_SCORE / 8)))) for _ in range(n)]
+
+
+def _skewed(rng, n):
+    # Most players have low scores, a few have very high ones
+    return [min(MAX_SCORE - 1, int(rng.paretovariate(1.5) * 100)) for _ in range(n)]
+
+
+def _few_unique(rng, n):
+    # Lots of ties (scores are multiples of 10 from a small range)
+    return [rng.randrange(50) * 10 for _ in range(n)]
+
+
+def _sorted(rng, n):
+    return sorted(_uniform(rng, n), reverse=True)
+
+
+def _reversed(rng, n):
+    return sorted(_uniform(rng, n))
+
+
+DISTRIBUTIONS = {
+    'uniform': _uniform,
+    'normal': _normal,
+    'skewed': _skewed,
+    'few_unique': _few_unique,
+    'sorted': _sorted,
+    'reversed': _reversed,
+}
+
+
+def make_leaderboard(size, distribution='uniform', seed=0):
+    """Synthetic leaderboard: [{'username': ..., 'score': ...}, ...]"""
+    rng = random.Random(f"{seed}-{distribution}-{size}")
+    scores = DISTRIBUTIONS[distribution](rng, size)
+    return [{'username': f"player{i}", 'score': score} for i, score in enumerate(scores)]
+
+
+def get_score(item):
+    if isinstance(item, dict):
+        return item.get('score', 0)
+    return 0
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def benchmark_sort(algorithm, data, trials=DEFAULT_TRIALS, key_func=get_score):
+    """
+    Time one algorithm on one dataset.
+    Timings are taken without tracemalloc; peak memory is measured in one extra run
+    """
+    sort = SORTS[algorithm]
+    times = []
+    result = None
+    for _ in range(trials):
+        start = time.perf_counter()
+        result = sort(data, key_func)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        sort(data, key_func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    expected = sorted((key_func(item) for item in data), reverse=True)
+    return {
+        'algorithm': algorithm,
+        'size': len(data),
+        'trials': trials,
+        'median_ms': median(times),
+        'p95_ms': percentile(times, 0.95),
+        'min_ms': min(times),
+        'max_ms': max(times),
+        'peak_memory_kb': peak / 1024,
+        'correct': [key_func(item) for item in result] == expected,
+    }
+
+
+def start_benchmark_process(algorithm, data, trials=DEFAULT_TRIALS):
+    """
+    Run benchmark_sort in a child process and return a concurrent.futures.Future
+    with its result dict. The GIL and tracemalloc (which is process-wide) stay in
+    the child; the process exits once the measurement is done
+    """
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        return executor.submit(benchmark_sort, algorithm, data, trials)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, distributions=tuple(DISTRIBUTIONS), algorithms=None,
+                  trials=DEFAULT_TRIALS, seed=0, limits=True, progress=None, stop_event=None):
+    """
+    Run the whole matrix and return a list of result rows (see CSV_FIELDS).
+    progress(row) is called after every measurement; stop_event (threading.Event) aborts early
+    """
+    algorithms = algorithms or available_sorts()
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            data = make_leaderboard(size, distribution, seed)
+            for algorithm in algorithms:
+                if stop_event is not None and stop_event.is_set():
+                    return results
+                if limits and size > SIZE_LIMITS.get(algorithm, size):
+                    continue
+                row = benchmark_sort(algorithm, data, trials)
+                row['distribution'] = distribution
+                results.append(row)
+                if progress is not None:
+                    progress(row)
+    return results
+
+
+def write_csv(results, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({field: row[field] for field in CSV_FIELDS})
+
+
+def format_row(row):
+    return (f"{row['algorithm']:<10} {row['distribution']:<11} {row['size']:>8} "
+            f"median {row['median_ms']:>10.3f} ms  p95 {row['p95_ms']:>10.3f} ms  "
+            f"peak {row['peak_memory_kb']:>10.1f} KB  {'ok' if row['correct'] else 'WRONG'}")
+
+
+def _csv_list(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard sorting algorithms")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated leaderboard sizes")
+    parser.add_argument('--distributions', default=','.join(DISTRIBUTIONS),
+                        help=f"comma-separated score distributions ({', '.join(DISTRIBUTIONS)})")
+    parser.add_argument('--algorithms', default=','.join(available_sorts()),
+                        help=f"comma-separated algorithms ({', '.join(SORTS)})")
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', help="write results to this CSV file")
+    parser.add_argument('--no-limits', action='store_true',
+                        help="also run slow algorithms on large inputs")
+    args = parser.parse_args(argv)
+
+    algorithms = _csv_list(args.algorithms)
+    unknown = [name for name in algorithms if name not in SORTS]
+    if unknown:
+        parser.error(f"unknown algorithms: {', '.join(unknown)}")
+    missing = [name for name in algorithms if name not in available_sorts()]
+    if missing:
+        print(f"Skipping {', '.join(missing)}: numpy is not installed", file=sys.stderr)
+        algorithms = [name for name in algorithms if name not in missing]
+    distributions = _csv_list(args.distributions)
+    unknown = [name for name in distributions if name not in DISTRIBUTIONS]
+    if unknown:
+        parser.error(f"unknown distributions: {', '.join(unknown)}")
+
+    results = run_benchmark(
+        sizes=[int(size) for size in _csv_list(args.sizes)],
+        distributions=distributions,
+        algorithms=algorithms,
+        trials=args.trials,
+        seed=args.seed,
+        limits=not args.no_limits,
+        progress=lambda row: print(format_row(row), flush=True),
+    )
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"Saved {len(results)} rows to {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
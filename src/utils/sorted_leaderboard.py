@@ -0,0 +1,89 @@
+"""
+Locally sorted leaderboard that can be updated with deltas
+"""
+import threading
+
+from src.utils.leaderboard_index import LeaderboardIndex
+
+
+class SortedLeaderboard:
+    """
+    Leaderboard entries ordered by score (descending, ties by username) in a
+    LeaderboardIndex, so applying a delta costs O(log n) per changed player
+    and rank_of / row lookups are O(log n) instead of re-sorting or copying
+    the whole list.
+
+    One thread writes (the LeaderboardClient worker), the UI thread reads:
+    every method takes the lock. The board is also a read-only sequence of
+    rows for VirtualList: board[i] -> {'rank', 'username', 'score'}, or None
+    if the board shrank since the caller looked at len(board).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = LeaderboardIndex()
+        # Server-side version of the data, None until the first full fetch
+        self.version = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index)
+
+    def __getitem__(self, position):
+        with self._lock:
+            rows = self._index.entries_from(position + 1, 1)
+        if not rows:
+            return None
+        rank, username, score = rows[0]
+        return {'rank': rank, 'username': username, 'score': score}
+
+    @staticmethod
+    def _parse(entry):
+        return str(entry.get('username', 'Unknown')), int(entry.get('score') or 0)
+
+    def replace_all(self, entries, version=None):
+        """Load a full leaderboard (several rows for one player: the best one is kept)"""
+        # Built outside the lock, readers keep seeing the old board meanwhile
+        index = LeaderboardIndex(self._parse(entry) for entry in entries if isinstance(entry, dict))
+        with self._lock:
+            self._index = index
+            self.version = version
+
+    def apply(self, changes, removed=(), version=None):
+        """
+        Merge a delta: changes is a list of {username, score}, removed a list of usernames.
+        Returns (changed [(username, score), ...], removed usernames that were on the board)
+        """
+        changed = []
+        gone = []
+        with self._lock:
+            for username in removed:
+                if self._index.remove(username):
+                    gone.append(username)
+            for entry in changes:
+                username, score = self._parse(entry)
+                if self._index.score_of(username) == score:
+                    continue
+                self._index.update(username, score)
+                changed.append((username, score))
+            if version is not None:
+                self.version = version
+        return changed, gone
+
+    def rank_of(self, username):
+        with self._lock:
+            return self._index.rank_of(username)
+
+    def score_of(self, username):
+        with self._lock:
+            return self._index.score_of(username)
+
+    def rows(self, start, count):
+        """Up to count rows from a 0-based position: [{'rank', 'username', 'score'}, ...]"""
+        with self._lock:
+            entries = self._index.entries_from(start + 1, count)
+        return [{'rank': rank, 'username': username, 'score': score} for rank, username, score in entries]
+
+    def entries(self):
+        """All rows in display order"""
+        return self.rows(0, len(self))
@@ -0,0 +1,106 @@
+"""
+Sorting algorithms for leaderboard data (descending by key, input is not modified)
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def insertion_sort(arr, key_func):
+    """Insertion Sort algorithm (descending order for leaderboard)"""
+    arr = list(arr)
+    keys = [key_func(item) for item in arr]
+    for i in range(1, len(arr)):
+        item = arr[i]
+        key = keys[i]
+        j = i - 1
+        while j >= 0 and keys[j] < key:  # Descending: higher score first
+            arr[j + 1] = arr[j]
+            keys[j + 1] = keys[j]
+            j -= 1
+        arr[j + 1] = item
+        keys[j + 1] = key
+    return arr
+
+
+def heap_sort(arr, key_func):
+    """Heap Sort algorithm (descending order for leaderboard)"""
+    arr = list(arr)
+    keys = [key_func(item) for item in arr]
+
+    def sift_down(n, i):
+        # Iterative heapify: no recursion, keys are swapped together with items
+        while True:
+            largest = i
+            left = 2 * i + 1
+            right = left + 1
+            if left < n and keys[left] > keys[largest]:
+                largest = left
+            if right < n and keys[right] > keys[largest]:
+                largest = right
+            if largest == i:
+                return
+            arr[i], arr[largest] = arr[largest], arr[i]
+            keys[i], keys[largest] = keys[largest], keys[i]
+            i = largest
+
+    n = len(arr)
+    for i in range(n // 2 - 1, -1, -1):
+        sift_down(n, i)
+    for i in range(n - 1, 0, -1):
+        arr[0], arr[i] = arr[i], arr[0]
+        keys[0], keys[i] = keys[i], keys[0]
+        sift_down(i, 0)
+    # Reverse for descending order (highest score first)
+    arr.reverse()
+    return arr
+
+
+def radix_sort(arr, key_func):
+    """Radix Sort algorithm (LSD, base 10, non-negative integer keys, descending order for leaderboard)"""
+    pairs = [(key_func(item), item) for item in arr]
+    if not pairs:
+        return []
+
+    max_val = max(key for key, _ in pairs)
+    exp = 1
+    while max_val // exp > 0:
+        # Stable bucket pass for each digit
+        buckets = [[] for _ in range(10)]
+        for pair in pairs:
+            buckets[(pair[0] // exp) % 10].append(pair)
+        pairs = [pair for bucket in buckets for pair in bucket]
+        exp *= 10
+
+    # Reverse for descending order (highest score first)
+    return [item for _, item in reversed(pairs)]
+
+
+def builtin_sort(arr, key_func):
+    """Python's sorted() (Timsort) as the baseline"""
+    return sorted(arr, key=key_func, reverse=True)
+
+
+def numpy_argsort(arr, key_func):
+    """NumPy argsort over the keys; needs numpy"""
+    if numpy is None:
+        raise RuntimeError("numpy is not installed")
+    keys = numpy.fromiter((key_func(item) for item in arr), dtype=numpy.int64, count=len(arr))
+    order = numpy.argsort(-keys, kind="stable")
+    return [arr[i] for i in order]
+
+
+SORTS = {
+    'insertion': insertion_sort,
+    'heap': heap_sort,
+    'radix': radix_sort,
+    'sorted': builtin_sort,
+    'numpy': numpy_argsort,
+}
+
+
+def available_sorts():
+    """Names of the sorts that can run here (numpy only if it is installed)"""
+    return [name for name in SORTS if name != 'numpy' or numpy is not None]
@@ -0,0 +1,103 @@
+import pygame
+
+
+class VirtualList:
+    """
+    Virtualized list of rows.
+
+    Only the visible window plus `overscan` rows on each side is kept as
+    rendered Surfaces; a row is rendered once and re-rendered only when its
+    key (row_key(item, index)) changes. Drawing is a blit per visible row, so
+    the cost per frame does not depend on how many items are loaded.
+
+    row_renderer(item, index, width, height) -> Surface
+    row_key(item, index) -> hashable value describing what the row shows
+    """
+
+    def __init__(self, row_renderer, row_key, visible_rows=10, overscan=3):
+        self.row_renderer = row_renderer
+        self.row_key = row_key
+        self.visible_rows = visible_rows
+        self.overscan = overscan
+        self.items = []
+        self.scroll_offset = 0
+        self.row_size = None
+        # index -> (key, Surface)
+        self._rows = {}
+        self.stats = {"rendered": 0, "reused": 0}
+
+    def set_items(self, items):
+        """Replace the item list; cached rows are kept and checked by key"""
+        self.items = items
+        self.scroll_offset = self.clamp(self.scroll_offset)
+
+    def set_row_size(self, width, height):
+        """Row size in pixels; a new size (window resize) drops every cached row"""
+        row_size = (max(1, int(width)), max(1, int(height)))
+        if row_size != self.row_size:
+            self.row_size = row_size
+            self._rows.clear()
+
+    def invalidate(self):
+        self._rows.clear()
+
+    @property
+    def max_scroll(self):
+        return max(0, len(self.items) - self.visible_rows)
+
+    def clamp(self, offset):
+        return max(0, min(offset, self.max_scroll))
+
+    def scroll_by(self, rows):
+        self.scroll_offset = self.clamp(self.scroll_offset + rows)
+
+    def scroll_to(self, offset):
+        self.scroll_offset = self.clamp(offset)
+
+    def visible_range(self):
+        start = self.scroll_offset
+        return start, min(start + self.visible_rows, len(self.items))
+
+    def _row_surface(self, index):
+        item = self.items[index]
+        key = self.row_key(item, index)
+        cached = self._rows.get(index)
+        if cached is not None and cached[0] == key:
+            self.stats["reused"] += 1
+            return cached[1]
+        surface = self.row_renderer(item, index, self.row_size[0], self.row_size[1])
+        self._rows[index] = (key, surface)
+        self.stats["rendered"] += 1
+        return surface
+
+    def _prefetch(self, start, end):
+        """Keep overscan rows rendered and evict everything outside the window"""
+        keep_start = max(0, start - self.overscan)
+        keep_end = min(len(self.items), end + self.overscan)
+        for index in [i for i in self._rows if i < keep_start or i >= keep_end]:
+            del self._rows[index]
+        # Render at most one missing overscan row per frame to spread the cost
+        for index in range(keep_start, keep_end):
+            if index not in self._rows:
+                self._row_surface(index)
+                break
+
+    def draw(self, surface, x, y):
+        """Blit the visible rows with the top-left corner at (x, y)"""
+        if self.row_size is None:
+            return
+        start, end = self.visible_range()
+        row_height = self.row_size[1]
+        for index in range(start, end):
+            surface.blit(self._row_surface(index), (x, y + (index - start) * row_height))
+        self._prefetch(start, end)
+
+    def row_at(self, x, y, pos):
+        """Item index under pos for a list drawn at (x, y), or None"""
+        if self.row_size is None:
+            return None
+        rect = pygame.Rect(x, y, self.row_size[0], self.row_size[1] * self.visible_rows)
+        if not rect.collidepoint(pos):
+            return None
+        index = self.scroll_offset + (pos[1] - y) // self.row_size[1]
+        return index if index < len(self.items) else None
@@ -0,0 +1,176 @@
+"""
+ScoreQueue against a local stub of PATCH /leaderboard/save
+
+    python -m pytest tests
+"""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from src.utils import score_queue
+from src.utils.api_client import ApiClient
+from src.utils.score_queue import ScoreQueue, BATCH_SIZE
+
+WAIT_TIMEOUT = 10.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_PATCH(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length).decode())
+        server = self.server
+        with server.lock:
+            server.requests.append((time.monotonic(), payload))
+            status = server.statuses.pop(0) if server.statuses else 200
+        body = json.dumps({'ok': status < 400}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.requests = []  # [(monotonic time, payload), ...]
+        self.statuses = []  # status codes for the next requests, then 200
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def payloads(self):
+        with self.lock:
+            return [payload for _, payload in self.requests]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+def free_port():
+    """A port nobody listens on: requests to it fail with a connection error"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(condition, timeout=WAIT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class ScoreQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.directory = tempfile.mkdtemp()
+        self.outbox_file = os.path.join(self.directory, "score_outbox.jsonl")
+        self.queues = []
+        # Short backoff so retries happen within the test
+        patcher = mock.patch.object(score_queue, "BACKOFF_BASE", 0.1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.stop()
+        self.server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_queue(self, url=None, queue_class=ScoreQueue):
+        queue = queue_class(api=ApiClient(url or self.server.url, timeout=2), outbox_file=self.outbox_file)
+        self.queues.append(queue)
+        return queue
+
+    def test_server_error_is_retried_with_growing_backoff(self):
+        self.server.statuses = [503, 503, 503]
+        queue = self.make_queue()
+        queue.submit("alice", 100, "s1")
+
+        self.assertTrue(wait_for(lambda: queue.pending_count() == 0))
+        with self.server.lock:
+            times = [at for at, _ in self.server.requests]
+        self.assertEqual(len(times), 4)
+        self.assertEqual(queue.stats["retries"], 3)
+        self.assertEqual(queue.stats["sent"], 1)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        # Delay n is BACKOFF_BASE * 2 ** (n - 1) with jitter in [0.5, 1.0]
+        for n, gap in enumerate(gaps, 1):
+            self.assertGreaterEqual(gap, 0.1 * 2 ** (n - 1) * 0.5 - 0.01)
+        self.assertGreater(gaps[2], gaps[0])
+        self.assertEqual(queue.failures, 0)
+
+    def test_duplicate_submission_is_sent_once(self):
+        queue = self.make_queue()
+        self.assertTrue(queue.submit("alice", 100, "s1"))
+        self.assertFalse(queue.submit("alice", 100, "s1"))  # still pending
+        self.assertTrue(wait_for(lambda: queue.pending_count() == 0))
+        self.assertFalse(queue.submit("alice", 100, "s1"))  # already delivered
+        self.assertTrue(queue.submit("alice", 100, "s2"))  # another game with the same score
+        self.assertTrue(wait_for(lambda: queue.pending_count() == 0))
+
+        self.assertEqual(self.server.payloads(), [{"username": "alice", "score": 100}] * 2)
+        self.assertEqual(queue.stats["duplicates"], 2)
+
+    def test_outbox_is_resent_after_restart(self):
+        offline = self.make_queue(url=f"http://127.0.0.1:{free_port()}")
+        offline.submit("alice", 100, "s1")
+        offline.submit("bob", 200, "s2")
+        self.assertTrue(wait_for(lambda: offline.stats["retries"] >= 1))
+        offline.stop()
+        self.assertEqual(offline.pending_count(), 2)
+
+        queue = self.make_queue()
+        self.assertEqual(queue.pending_count(), 2)
+        queue.start()
+        self.assertTrue(wait_for(lambda: queue.pending_count() == 0))
+
+        self.assertEqual(self.server.payloads(),
+                         [{"username": "alice", "score": 100}, {"username": "bob", "score": 200}])
+        with open(self.outbox_file, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "")
+
+    def test_large_backlog_is_sent_in_batches(self):
+        entries = [{"username": f"player{i}", "score": i, "session": f"s{i}", "created": 0}
+                   for i in range(BATCH_SIZE + 5)]
+        with open(self.outbox_file, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+        batches = []
+
+        class RecordingQueue(ScoreQueue):
+            def _send_batch(self, batch):
+                batches.append(len(batch))
+                super()._send_batch(batch)
+
+        queue = self.make_queue(queue_class=RecordingQueue)
+        queue.start()
+        self.assertTrue(wait_for(lambda: queue.pending_count() == 0))
+
+        self.assertEqual(batches, [BATCH_SIZE, 5])
+        self.assertEqual([payload["score"] for payload in self.server.payloads()], list(range(BATCH_SIZE + 5)))
+
+
+if __name__ == '__main__':
+    unittest.main()